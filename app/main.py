@@ -1,16 +1,25 @@
+import sys
+import time
+
+# taken before any heavy import, for --profile-startup
+_STARTUP_T0 = time.perf_counter()
+
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QFrame, QPushButton, QLabel, QStackedWidget, QSizePolicy
 )
-from PySide6.QtCore import Qt
-import sys
+from PySide6.QtCore import Qt, QObject, QEvent, QTimer
+
+_PYSIDE_IMPORTED = time.perf_counter()
 
-from sac_pages.wiki_page import WikiPage
+from sac_pages import profiling
 from sac_pages.damage_page import DamagePage
-from sac_pages.quests_page import QuestsPage
-from sac_pages.farming_page import FarmingPage
-from sac_pages.settings_page import SettingsPage
+from sac_pages.datapack import DataPackError
+from sac_pages.logs import get_logger, setup_logging
+
+_APP_IMPORTED = time.perf_counter()
 
+log = get_logger("app")
 
 
 class MainWindow(QMainWindow):
@@ -23,9 +32,12 @@ class MainWindow(QMainWindow):
         self.app_state = {}
 
         self._init_translations()
-        self._init_ui()
-        self._apply_style()
+        with profiling.span("_init_ui"):
+            self._init_ui()
+        with profiling.span("_apply_style"):
+            self._apply_style()
         self._apply_language()
+        self._start_data_watcher()
 
     def _init_translations(self):
         self.translations = {
@@ -129,22 +141,19 @@ class MainWindow(QMainWindow):
         self.page_title = QLabel()
         self.page_title.setObjectName("PageTitleLabel")
 
+        # Pages are built on first visit (see _ensure_page); until then the
+        # stack holds empty placeholders so the indices stay fixed.
         self.stack = QStackedWidget()
-        self.page_wiki = WikiPage()
-        self.page_damage = DamagePage(app_state=self.app_state, name_style=self.name_style)
-        self.page_quests = QuestsPage()
-        self.page_farm = FarmingPage(app_state=self.app_state, name_style=self.name_style)
-        self.page_settings = SettingsPage(
-            on_language_change=self.set_language,
-            on_rgb_toggle=self.set_rgb_enabled,
-            on_name_style_change=self.set_name_style,
-        )
-
-        self.stack.addWidget(self.page_wiki)
-        self.stack.addWidget(self.page_damage)
-        self.stack.addWidget(self.page_quests)
-        self.stack.addWidget(self.page_farm)
-        self.stack.addWidget(self.page_settings)
+        self._page_factories = [
+            ("page_wiki", self._create_wiki_page),
+            ("page_damage", self._create_damage_page),
+            ("page_quests", self._create_quests_page),
+            ("page_farm", self._create_farming_page),
+            ("page_settings", self._create_settings_page),
+        ]
+        for attr, _factory in self._page_factories:
+            setattr(self, attr, None)
+            self.stack.addWidget(QWidget())
 
         # Footer inside content panel
         footer_layout = QHBoxLayout()
@@ -172,7 +181,109 @@ class MainWindow(QMainWindow):
 
         self._switch_page(1, "damage")  # open damage by default
 
+    # ------------------- Lazy pages -------------------
+
+    def _create_wiki_page(self):
+        from sac_pages.wiki_page import WikiPage
+        return WikiPage()
+
+    def _create_damage_page(self):
+        return DamagePage(app_state=self.app_state, name_style=self.name_style)
+
+    def _create_quests_page(self):
+        from sac_pages.quests_page import QuestsPage
+        return QuestsPage()
+
+    def _create_farming_page(self):
+        from sac_pages.farming_page import FarmingPage
+        return FarmingPage(app_state=self.app_state, name_style=self.name_style)
+
+    def _create_settings_page(self):
+        from sac_pages.settings_page import SettingsPage
+        return SettingsPage(
+            on_language_change=self.set_language,
+            on_rgb_toggle=self.set_rgb_enabled,
+            on_name_style_change=self.set_name_style,
+        )
+
+    # ------------------- Hot reload -------------------
+
+    def _start_data_watcher(self):
+        from sac_pages import models
+        from sac_pages.reloader import DataFileWatcher
+
+        self.data_watcher = DataFileWatcher(self)
+        npc_file, _mode = models._get_npc_file()
+        self.data_watcher.watch(
+            npc_file,
+            models.reload_npc_repository,
+            self._on_npcs_reloaded,
+            lambda e: log.error("reloading npcs.json failed: %r", e),
+        )
+
+    def _on_npcs_reloaded(self, result):
+        if result is None:
+            return  # unchanged, or NPCs not in use yet
+        from sac_pages import models
+        from sac_pages.names import reset_name_index
+
+        repo, diff = result
+        models.set_npc_repository(repo)
+        reset_name_index()
+        log.info(
+            "npcs.json reloaded: %d added, %d removed, %d changed",
+            len(diff["added"]), len(diff["removed"]), len(diff["changed"]),
+        )
+        for page in self._built_pages():
+            if hasattr(page, "apply_npc_changes"):
+                page.apply_npc_changes(repo, diff)
+
+    def _ensure_page(self, index: int):
+        attr, factory = self._page_factories[index]
+        page = getattr(self, attr)
+        if page is not None:
+            return page
+
+        with profiling.span(f"page {attr}"):
+            try:
+                page = factory()
+            except DataPackError as e:
+                # broken / missing game data: say so, try again on the next visit
+                log.error("building %s failed: %s", attr, e)
+                self._show_page_error(index, e)
+                return None
+        if self.language != "en" and hasattr(page, "set_language"):
+            page.set_language(self.language)
+
+        placeholder = self.stack.widget(index)
+        self.stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.stack.insertWidget(index, page)
+        setattr(self, attr, page)
+        return page
+
+    def _show_page_error(self, index: int, error: Exception):
+        if self.language == "de":
+            text = f"Die Spieldaten konnten nicht geladen werden:\n{error}"
+        else:
+            text = f"The game data could not be loaded:\n{error}"
+        label = QLabel(text)
+        label.setWordWrap(True)
+        label.setAlignment(Qt.AlignCenter)
+
+        placeholder = self.stack.widget(index)
+        self.stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.stack.insertWidget(index, label)
+
+    def _built_pages(self):
+        for attr, _factory in self._page_factories:
+            page = getattr(self, attr)
+            if page is not None:
+                yield page
+
     def _switch_page(self, index: int, key: str):
+        self._ensure_page(index)
         self.stack.setCurrentIndex(index)
 
         titles = {
@@ -195,16 +306,9 @@ class MainWindow(QMainWindow):
             return
         self.language = lang
         self._apply_language()
-        if hasattr(self.page_damage, "set_language"):
-            self.page_damage.set_language(lang)
-        if hasattr(self.page_wiki, "set_language"):
-            self.page_wiki.set_language(lang)
-        if hasattr(self.page_quests, "set_language"):
-            self.page_quests.set_language(lang)
-        if hasattr(self.page_farm, "set_language"):
-            self.page_farm.set_language(lang)
-        if hasattr(self.page_settings, "set_language"):
-            self.page_settings.set_language(lang)
+        for page in self._built_pages():
+            if hasattr(page, "set_language"):
+                page.set_language(lang)
 
     def set_rgb_enabled(self, enabled: bool):
         self.rgb_enabled = enabled
@@ -214,10 +318,9 @@ class MainWindow(QMainWindow):
         if style not in ("vanilla", "mod"):
             return
         self.name_style = style
-        if hasattr(self.page_damage, "set_name_style"):
-            self.page_damage.set_name_style(style)
-        if hasattr(self.page_farm, "set_name_style"):
-            self.page_farm.set_name_style(style)
+        for page in self._built_pages():
+            if hasattr(page, "set_name_style"):
+                page.set_name_style(style)
 
     def _apply_language(self):
         tr = self.translations[self.language]
@@ -423,9 +526,69 @@ class MainWindow(QMainWindow):
         self.setStyleSheet(stylesheet)
 
 
+class _FirstPaintWatcher(QObject):
+    """
+    Ends the startup profile once the main window has painted, then writes
+    the report.
+    """
+
+    def __init__(self, report_path: str, parent=None):
+        super().__init__(parent)
+        self.report_path = report_path
+        self._done = False
+
+    def eventFilter(self, obj, event):
+        if not self._done and event.type() == QEvent.Paint:
+            self._done = True
+            # the paint itself is handled after this filter returns
+            QTimer.singleShot(0, self._finish)
+        return False
+
+    def _finish(self):
+        now = time.perf_counter()
+        profiling.profiler.add_span("startup (to first paint)", _STARTUP_T0, now)
+        try:
+            profiling.profiler.write(self.report_path)
+            log.info("startup profile written to %s", self.report_path)
+        except OSError as e:
+            log.error("writing startup profile %s failed: %r", self.report_path, e)
+
+
+def _profile_startup_path(argv: list) -> str | None:
+    for arg in argv[1:]:
+        if arg == "--profile-startup":
+            return "startup_profile.json"
+        if arg.startswith("--profile-startup="):
+            return arg.split("=", 1)[1] or "startup_profile.json"
+    return None
+
+
+def _log_level(argv: list) -> str:
+    for arg in argv[1:]:
+        if arg.startswith("--log-level="):
+            return arg.split("=", 1)[1] or "info"
+    return "info"
+
+
 def main():
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    setup_logging(_log_level(sys.argv))
+    report_path = _profile_startup_path(sys.argv)
+    argv = [a for a in sys.argv if not a.startswith(("--profile-startup", "--log-level"))]
+
+    if report_path:
+        profiling.profiler.enable(origin=_STARTUP_T0)
+        profiling.profiler.add_span("import PySide6", _STARTUP_T0, _PYSIDE_IMPORTED)
+        profiling.profiler.add_span("import sac_pages", _PYSIDE_IMPORTED, _APP_IMPORTED)
+
+    with profiling.span("QApplication"):
+        app = QApplication(argv)
+    with profiling.span("MainWindow"):
+        window = MainWindow()
+
+    if report_path:
+        watcher = _FirstPaintWatcher(report_path, window)
+        window.installEventFilter(watcher)
+
     window.show()
     sys.exit(app.exec())
 
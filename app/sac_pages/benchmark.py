@@ -0,0 +1,481 @@
+"""
+Benchmarks for the damage model and the NPC code paths.
+
+Times calculate_damage_overview() and its parts for small, typical and
+worst-case builds, optimize_loadout() for a late-game inventory, and
+suggest_best_npcs() / load_npcs() / load_npc_table() for synthetic NPC
+sets of 50, 5k and 500k entries. load_npc_table[...] covers the three ways
+it gets its table: parsing npcs.json, the pickled npcs.json.cache and a
+compile_data compiled/npcs.json. farming_sweep[...] ranks the top 10 along
+a DPS slider, once directly and once through a freshly built
+farming.BreakpointIndex (sets above its MAX_ROWS are skipped). Results are
+written as JSON; given an earlier result file as baseline, every scenario
+that got slower by more than --threshold percent is reported and the exit
+code is 1.
+
+From code:
+
+    from sac_pages import benchmark
+
+    results = benchmark.run_benchmarks(sizes=(50, 5000))
+    regressions = benchmark.compare(results, baseline, threshold=10.0)
+
+From the command line (run inside app/):
+
+    python -m sac_pages.benchmark -o baseline.json
+    ... change the engine ...
+    python -m sac_pages.benchmark -o after.json --baseline baseline.json --threshold 10
+
+Only results from the same machine are comparable: the file records
+platform, Python version and CPU count, and compare() refuses a baseline
+where they differ (--ignore-platform compares anyway, with a warning).
+Timings are seconds per call; the best of --repeat runs is what gets
+compared, the median is recorded for reference.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+from . import compile_data, farming, models, optimizer
+
+
+NPC_SIZES = (50, 5_000, 500_000)
+QUICK_SIZES = (50, 5_000)
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 10.0  # percent
+RESULTS_FORMAT = 1
+
+# result fields that must match for two result files to be comparable
+ENVIRONMENT_KEYS = ("python", "platform", "cpu_count")
+
+# optimize_loadout scenarios: a late-game inventory, every laser type and
+# all drone slots (a full search must stay interactive)
+OPTIMIZER_INVENTORY = {
+    "lasers": {"LW3": 25, "LW4": 20, "LW4U": 15, "PRL": 15},
+    "drones": {"IRIS": 8, "APIS": 1, "ZEUS": 1},
+}
+
+# DPS values of the farming_sweep scenarios (a slider being dragged)
+SWEEP_DPS = farming.dps_range(5_000, 100_000, 250)
+SWEEP_TOP_N = 10
+
+MAPS = ("X-1", "X-2", "X-3", "X-4", "X-5", "BL-1", "BL-2", "BL-3", "Saturn")
+
+
+# ------------------------------------------------------------------
+# Scenarios
+# ------------------------------------------------------------------
+
+def small_state() -> dict:
+    # a fresh account: a few lasers, nothing else
+    state = models.default_damage_state()
+    state["laser_groups"][0]["count"] = 3
+    for drone in state["drones"].values():
+        drone["count"] = 0
+    return state
+
+
+def typical_state() -> dict:
+    # mid game: LW4 on ship and drones, rockets, launcher
+    state = models.default_damage_state()
+    state["laser_groups"][0].update(count=4, upgrade=8)
+    state["laser_groups"][1].update(count=6, upgrade=4)
+    state["drones"]["IRIS"].update(count=8, level=12, design="HAVOC")
+    state["lasers_on_drones_by_type"].update(LW3=6, LW4=10)
+    state["skills"].update(missile_targeting=2, rocket_engineering=2, saturn_conqueror=1)
+    state["formation"] = "ARROW"
+    state["damage_booster"] = 0.10
+    state["rockets"]["type"] = "SIM311"
+    state["rocket_launcher"]["launcher_type"] = "HST1"
+    return state
+
+
+def worst_state() -> dict:
+    # everything switched on: all laser types, every drone slot filled,
+    # max skills, launcher against Saturn, pirate target
+    state = models.default_damage_state()
+    state["laser_groups"] = [
+        {"type": laser_id, "count": 15, "upgrade": 16} for laser_id in models.LASERS
+    ]
+    state["ammo"] = list(models.AMMO)[-1]
+    state["target_is_pirate"] = True
+
+    slots = 0
+    designs = [d for d in models.DRONE_DESIGNS if d != "NONE"] or ["NONE"]
+    state["drones"] = {}
+    for i, (drone_id, drone_def) in enumerate(models.DRONES.items()):
+        count = int(drone_def.get("max_count", 1) or 1)
+        lasers = int(drone_def.get("max_lasers", 0) or 0)
+        state["drones"][drone_id] = {
+            "count": count, "level": 16, "design": designs[i % len(designs)], "lasers_per_drone": lasers,
+        }
+        slots += count * lasers
+    laser_ids = list(models.LASERS)
+    state["lasers_on_drones_by_type"] = {laser_id: 0 for laser_id in laser_ids}
+    for i in range(slots):
+        state["lasers_on_drones_by_type"][laser_ids[i % len(laser_ids)]] += 1
+
+    state["skills"] = {
+        "missile_targeting": 5, "rocket_engineering": 5, "saturn_conqueror": 5, "bounty_hunter": 5,
+    }
+    state["formation"] = list(models.FORMATIONS)[-1]
+    state["damage_booster"] = 0.25
+    state["rockets"]["type"] = list(models.ROCKETS)[-1]
+    state["rocket_launcher"] = {
+        "launcher_type": list(models.ROCKET_LAUNCHERS)[-1],
+        "rocket_type": list(models.RL_ROCKETS)[-1],
+        "target_is_saturn": True,
+    }
+    return state
+
+
+STATES = {
+    "small": small_state,
+    "typical": typical_state,
+    "worst": worst_state,
+}
+
+DAMAGE_FUNCTIONS = {
+    "calculate_damage_overview": models.calculate_damage_overview,
+    "laser_damage_per_second": models._laser_damage_per_second,
+    "standard_rocket_dps": models._standard_rocket_dps,
+    "rocket_launcher_dps": models._rocket_launcher_dps,
+}
+
+
+def make_npc_entries(count: int, seed: int = 0) -> list:
+    """
+    `count` synthetic npcs.json entries (raw form: reward values as strings,
+    like the shipped file). Same seed -> same entries.
+    """
+    rnd = random.Random(seed)
+    entries = []
+    for i in range(count):
+        health = rnd.randrange(400, 2_000_000, 100)
+        entries.append({
+            "id": f"npc_{i}",
+            "name": f"NPC {i}",
+            "map": MAPS[i % len(MAPS)],
+            "faction": "npc",
+            "is_pirate": rnd.random() < 0.1,
+            "health": health,
+            "shields": health // rnd.choice((1, 2, 4)),
+            "reward_uri": str(rnd.randrange(1, 5000)),
+            "reward_credits": str(rnd.randrange(100, 500_000)),
+        })
+    return entries
+
+
+def _npcs_from_entries(entries: list) -> list:
+    return [
+        models.NPC(e["id"], e["name"], e["map"], e["health"], e["shields"], e["reward_uri"],
+                   e["reward_credits"], e["faction"], e["is_pirate"])
+        for e in entries
+    ]
+
+
+def _sweep_direct(npcs):
+    for dps in SWEEP_DPS:
+        models.suggest_best_npcs(dps, npcs, top_n=SWEEP_TOP_N)
+
+
+def _sweep_index(npcs):
+    # build included: the index has to pay for itself within one sweep
+    index = farming.BreakpointIndex(npcs, top_n=SWEEP_TOP_N)
+    for dps in SWEEP_DPS:
+        index.lookup(dps)
+
+
+class _NpcFileOverride:
+    """
+    Point load_npcs() / load_npc_table() at `npc_file` and at
+    `compiled_file` (None: no compiled file) while active.
+    """
+
+    def __init__(self, npc_file: str, compiled_file: str | None = None):
+        self.npc_file = npc_file
+        self.compiled_file = compiled_file or npc_file + ".no-compiled"
+        self._saved = None
+
+    def __enter__(self):
+        self._saved = (models._get_npc_file, models._compiled_npc_file)
+        models._get_npc_file = lambda: (self.npc_file, "BENCH")
+        models._compiled_npc_file = lambda: self.compiled_file
+        return self
+
+    def __exit__(self, *exc):
+        models._get_npc_file, models._compiled_npc_file = self._saved
+        return False
+
+
+def _npc_file_setup(npc_file: str, size: int, compiled: bool):
+    """
+    setup() for the load scenarios: writes `size` entries to `npc_file`
+    (plus its compiled form if `compiled`) and points the loaders at them.
+    """
+
+    def _setup():
+        with open(npc_file, "w", encoding="utf-8") as f:
+            json.dump(make_npc_entries(size), f, ensure_ascii=False, indent=2)
+        compiled_file = None
+        if compiled:
+            compiled_file = npc_file + ".compiled"
+            compiled_data = compile_data.compile_npcs(npc_file, compile_data.Report())
+            compile_data._write_json(compiled_file, compiled_data)
+        override = _NpcFileOverride(npc_file, compiled_file).__enter__()
+
+        def _cleanup():
+            override.__exit__(None, None, None)
+            for path in (npc_file, models._npc_cache_file(npc_file), compiled_file):
+                if path and os.path.exists(path):
+                    os.remove(path)
+        return _cleanup
+    return _setup
+
+
+def _load_without_cache(npc_file: str):
+    # every call misses npcs.json.cache, so the table is parsed or compiled
+    cache_file = models._npc_cache_file(npc_file)
+
+    def _load():
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+        return models.load_npc_table()
+    return _load
+
+
+# ------------------------------------------------------------------
+# Timing
+# ------------------------------------------------------------------
+
+def time_call(func, repeat: int = DEFAULT_REPEAT) -> dict:
+    """
+    Seconds per call of func(): timeit.autorange() picks the loop count
+    (>= 0.2 s per run, also serves as warm-up), then `repeat` runs.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    per_call = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "best": min(per_call),
+        "median": statistics.median(per_call),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def _scenario_groups(sizes, workdir: str):
+    """
+    (setup, [(name, func), ...]) per group of scenarios that share their
+    input; setup() (or None) runs before the group is timed and returns a
+    cleanup callable.
+    """
+    for state_name, make_state in STATES.items():
+        state = make_state()
+        yield None, [
+            (f"{func_name}[{state_name}]", lambda f=func, s=state: f(s))
+            for func_name, func in DAMAGE_FUNCTIONS.items()
+        ]
+
+    held_npcs = {}
+
+    def _setup_optimizer(held=held_npcs):
+        held["npcs"] = _npcs_from_entries(make_npc_entries(QUICK_SIZES[0]))
+        return held.clear
+
+    yield _setup_optimizer, [
+        ("optimize_loadout[dps]", lambda: optimizer.optimize_loadout(OPTIMIZER_INVENTORY)),
+        ("optimize_loadout[dps,45 ship slots]",
+         lambda: optimizer.optimize_loadout(dict(OPTIMIZER_INVENTORY, ship_slots=45))),
+        (f"optimize_loadout[uri_per_hour,{QUICK_SIZES[0]}]",
+         lambda h=held_npcs: optimizer.optimize_loadout(OPTIMIZER_INVENTORY, objective="uri_per_hour", npcs=h["npcs"])),
+    ]
+
+    total_dps = models.calculate_damage_overview(typical_state())["total_dps"]
+    for size in sizes:
+        label = f"{size:,}".replace(",", "_")
+        held = {}
+
+        def _setup_npcs(size=size, held=held):
+            entries = make_npc_entries(size)
+            held["npcs"] = _npcs_from_entries(entries)
+            held["table"] = models._build_npc_table(entries)[0]
+            return held.clear
+
+        scenarios = [
+            (f"suggest_best_npcs[list,{label}]",
+             lambda h=held: models.suggest_best_npcs(total_dps, h["npcs"], top_n=10)),
+            (f"suggest_best_npcs[table,{label}]",
+             lambda h=held: models.suggest_best_npcs(total_dps, h["table"], top_n=10)),
+        ]
+        if size <= farming.BreakpointIndex.MAX_ROWS:
+            scenarios += [
+                (f"farming_sweep[direct,{label}]", lambda h=held: _sweep_direct(h["table"])),
+                (f"farming_sweep[index,{label}]", lambda h=held: _sweep_index(h["table"])),
+            ]
+        yield _setup_npcs, scenarios
+
+        npc_file = os.path.join(workdir, f"npcs_{size}.json")
+        yield _npc_file_setup(npc_file, size, compiled=False), [
+            (f"load_npcs[{label}]", models.load_npcs),
+            (f"load_npc_table[parsed,{label}]", _load_without_cache(npc_file)),
+            # the first (untimed) autorange call writes the cache
+            (f"load_npc_table[cache,{label}]", models.load_npc_table),
+        ]
+        yield _npc_file_setup(npc_file, size, compiled=True), [
+            (f"load_npc_table[compiled,{label}]", _load_without_cache(npc_file)),
+        ]
+
+
+def run_benchmarks(sizes=NPC_SIZES, repeat: int = DEFAULT_REPEAT, only=None, progress=None) -> dict:
+    """
+    Run all scenarios (or those whose name contains one of the strings in
+    `only`) and return the results document (see --output).
+    """
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="sac-bench-") as workdir:
+        for setup, scenarios in _scenario_groups(sizes, workdir):
+            if only:
+                scenarios = [(n, f) for n, f in scenarios if any(part in n for part in only)]
+            if not scenarios:
+                continue
+            cleanup = setup() if setup is not None else None
+            try:
+                for name, func in scenarios:
+                    results[name] = time_call(func, repeat)
+                    if progress is not None:
+                        progress(name, results[name])
+            finally:
+                if cleanup is not None:
+                    cleanup()
+
+    return {
+        "format": RESULTS_FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+
+
+def environment_mismatch(current: dict, baseline: dict) -> list:
+    """
+    [(key, baseline value, current value)] for the ENVIRONMENT_KEYS that
+    differ between two result documents.
+    """
+    return [
+        (key, baseline.get(key), current.get(key))
+        for key in ENVIRONMENT_KEYS
+        if baseline.get(key) != current.get(key)
+    ]
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+            check_environment: bool = True) -> list:
+    """
+    Scenarios present in both documents whose best time grew by more than
+    `threshold` percent: [(name, baseline s, current s, change %)], worst first.
+
+    Raises ValueError if the documents come from different environments
+    (see environment_mismatch()), unless check_environment is False.
+    """
+    if check_environment:
+        mismatch = environment_mismatch(current, baseline)
+        if mismatch:
+            raise ValueError("baseline is from another environment: " + ", ".join(
+                f"{key} {before!r} != {after!r}" for key, before, after in mismatch
+            ))
+    regressions = []
+    base_results = baseline.get("results", {})
+    for name, result in current.get("results", {}).items():
+        base = base_results.get(name)
+        if not base or base.get("best", 0) <= 0:
+            continue
+        change = (result["best"] / base["best"] - 1.0) * 100.0
+        if change > threshold:
+            regressions.append((name, base["best"], result["best"], change))
+    regressions.sort(key=lambda r: r[3], reverse=True)
+    return regressions
+
+
+# ------------------------------------------------------------------
+# Command line
+# ------------------------------------------------------------------
+
+def _format_seconds(seconds: float) -> str:
+    for unit, factor in (("s", 1.0), ("ms", 1e3), ("us", 1e6)):
+        if seconds * factor >= 1.0:
+            return f"{seconds * factor:.3f} {unit}"
+    return f"{seconds * 1e9:.1f} ns"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the damage model and NPC ranking / loading.")
+    parser.add_argument("-o", "--output", help="write the results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown per scenario in percent (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--sizes", type=int, nargs="+", default=None,
+                        help=f"NPC set sizes (default: {' '.join(map(str, NPC_SIZES))})")
+    parser.add_argument("--quick", action="store_true",
+                        help=f"only NPC sizes {' '.join(map(str, QUICK_SIZES))}, 3 repeats")
+    parser.add_argument("--only", nargs="+", help="run only scenarios whose name contains one of these")
+    parser.add_argument("--ignore-platform", action="store_true",
+                        help="compare against a baseline from another platform / Python (warns only)")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else NPC_SIZES)
+    repeat = 3 if args.quick and args.repeat == DEFAULT_REPEAT else args.repeat
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    def _progress(name, result):
+        print(f"[bench] {name:<45} {_format_seconds(result['best']):>12}  (median {_format_seconds(result['median'])})",
+              file=sys.stderr, flush=True)
+
+    report = run_benchmarks(sizes=sizes, repeat=repeat, only=args.only, progress=_progress)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        json.dump(report, out, indent=2)
+        out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if baseline is None:
+        return 0
+    mismatch = environment_mismatch(report, baseline)
+    for key, before, after in mismatch:
+        print(f"[bench] {'WARNING' if args.ignore_platform else 'ERROR'}: baseline {key} {before!r}, now {after!r}",
+              file=sys.stderr)
+    if mismatch and not args.ignore_platform:
+        print("[bench] timings from different environments are not comparable (--ignore-platform to compare anyway)",
+              file=sys.stderr)
+        return 2
+    regressions = compare(report, baseline, args.threshold, check_environment=False)
+    for name, before, after, change in regressions:
+        print(f"[bench] REGRESSION {name}: {_format_seconds(before)} -> {_format_seconds(after)} (+{change:.1f}%)",
+              file=sys.stderr)
+    if regressions:
+        print(f"[bench] {len(regressions)} scenario(s) slower than +{args.threshold:g}%", file=sys.stderr)
+        return 1
+    print(f"[bench] no regressions above +{args.threshold:g}%", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
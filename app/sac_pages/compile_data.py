@@ -0,0 +1,412 @@
+"""
+Offline "compile data" step for npcs.json and the data pack.
+
+Validates every data file (npcs.json entries with the loaders' own
+models.normalize_npc_entry, pack sections against the schemas below),
+normalizes types ("reward_uri": "4" -> 4, "true" -> True, ...), resolves
+aliases (NPC MOD names -> vanilla names, missing item name / name_mod) and
+writes runtime-ready copies to data/compiled/:
+
+    compiled/npcs.json      columns for NPCTable.from_columns(), plus the
+                            size, mtime and sha256 of the npcs.json they
+                            came from
+    compiled/pack/          normalized section files; the manifest records
+                            the fingerprints (and size / mtime stamps) of
+                            the source pack files
+
+The loaders (models.load_npc_table / load_npcs, datapack.get_data_pack)
+prefer these files while the recorded fingerprints match the sources, so
+an edited npcs.json or pack file simply falls back to the raw file until
+the next compile. Sources with the recorded size and mtime are not hashed
+again at startup.
+
+From the command line (run inside app/):
+
+    python -m sac_pages.compile_data             # validate + write compiled/
+    python -m sac_pages.compile_data --check     # validate only
+
+Errors (missing required fields, values that cannot be converted,
+ambiguous aliases) fail the run and nothing is written; --lenient drops
+the offending entries instead, which is what the loaders do with them.
+Warnings (unknown fields, resolved aliases, repeated NPC ids) only fail
+with --strict.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+
+from . import models
+from .datapack import DataPack, DataPackError, file_fingerprint, file_stamp, get_compiled_dir, get_pack_dir
+from .jsonstream import iter_json_file
+from .names import ITEM_SECTIONS
+
+
+COMPILED_FORMAT = models.NPC_COMPILED_FORMAT
+
+_MISSING = object()
+
+
+class Report:
+    def __init__(self, lenient: bool = False):
+        self.lenient = lenient
+        self.errors = []
+        self.warnings = []
+
+    def error(self, where: str, message: str):
+        self.errors.append(f"{where}: {message}")
+
+    def warning(self, where: str, message: str):
+        self.warnings.append(f"{where}: {message}")
+
+    def invalid(self, where: str, message: str):
+        # an entry that cannot be used: dropped with --lenient, fatal otherwise
+        if self.lenient:
+            self.warning(where, message + " (entry dropped)")
+        else:
+            self.error(where, message)
+
+
+# ------------------------------------------------------------------
+# Field types
+# ------------------------------------------------------------------
+
+# the same conversions as the NPC loaders (models.normalize_npc_entry)
+_int = models._strict_int
+_bool = models._strict_bool
+
+
+def _number(value):
+    # ints stay ints and floats stay floats, so calculations are unchanged
+    if isinstance(value, bool):
+        raise ValueError(f"{value!r} is not a number")
+    if isinstance(value, (int, float)):
+        result = value
+    elif isinstance(value, str):
+        try:
+            result = _int(value)
+        except ValueError:
+            try:
+                result = float(value.strip())
+            except ValueError:
+                raise ValueError(f"{value!r} is not a number") from None
+    else:
+        raise ValueError(f"{value!r} is not a number")
+    if isinstance(result, float) and not math.isfinite(result):
+        raise ValueError(f"{value!r} is not a finite number")
+    return result
+
+
+def _text(value) -> str:
+    if not isinstance(value, str):
+        raise ValueError(f"{value!r} is not a string")
+    return value.strip()
+
+
+class Field:
+    def __init__(self, convert, required=False, default=_MISSING, minimum=None, maximum=None, choices=None):
+        self.convert = convert
+        self.required = required
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = choices
+
+    def normalize(self, value):
+        value = self.convert(value)
+        if self.minimum is not None and value < self.minimum:
+            raise ValueError(f"{value!r} is below {self.minimum}")
+        if self.maximum is not None and value > self.maximum:
+            raise ValueError(f"{value!r} is above {self.maximum}")
+        if self.choices is not None and value not in self.choices:
+            raise ValueError(f"{value!r} is not one of {', '.join(self.choices)}")
+        return value
+
+
+# ------------------------------------------------------------------
+# Schemas
+# ------------------------------------------------------------------
+
+_NAMES = {
+    "name_en": Field(_text, required=True),
+    "name": Field(_text),
+    "name_mod": Field(_text),
+    "name_de": Field(_text),
+}
+
+_RATIO = dict(minimum=0, maximum=1)
+
+PACK_SCHEMAS = {
+    "lasers": {
+        **_NAMES,
+        "base_damage": Field(_number, required=True, minimum=0),
+        "base_damage_lvl16": Field(_number, minimum=0),
+        "shots_per_second": Field(_number, required=True, minimum=0),
+        "accuracy": Field(_number, required=True, **_RATIO),
+        "hidden_60": Field(_bool),
+    },
+    "ammo": {
+        **_NAMES,
+        "mult_normal": Field(_number, required=True, minimum=0),
+        "mult_pirate": Field(_number, required=True, minimum=0),
+    },
+    "drones": {
+        "name_en": Field(_text, required=True),
+        "max_count": Field(_int, required=True, minimum=0),
+        "max_lasers": Field(_int, required=True, minimum=0),
+    },
+    "drone_designs": {
+        "name_en": Field(_text, required=True),
+        "type": Field(_text, required=True, choices=("none", "laser", "rocket", "total")),
+        "laser_bonus": Field(_number, minimum=0),
+        "rocket_bonus": Field(_number, minimum=0),
+        "total_bonus": Field(_number, minimum=0),
+    },
+    "formations": {
+        "name_en": Field(_text, required=True),
+        "laser_global_mult": Field(_number, required=True, minimum=0),
+        "npc_laser_mult": Field(_number, required=True, minimum=0),
+        "rocket_mult": Field(_number, required=True, minimum=0),
+    },
+    "rockets": {
+        **_NAMES,
+        "base_damage": Field(_number, required=True, minimum=0),
+        "accuracy": Field(_number, required=True, **_RATIO),
+        "shots_per_second": Field(_number, required=True, minimum=0),
+    },
+    "rocket_launchers": {
+        **_NAMES,
+        "rockets_per_burst": Field(_int, required=True, minimum=0),
+        "reload_seconds": Field(_number, required=True, minimum=0),
+    },
+    "rl_rockets": {
+        **_NAMES,
+        "base_damage": Field(_number, required=True, minimum=0),
+        "accuracy": Field(_number, required=True, **_RATIO),
+        "bonus_vs_saturn": Field(_number, minimum=0),
+        "bonus_vs_players": Field(_number, minimum=0),
+    },
+}
+
+
+def normalize_record(schema: dict, raw, where: str, report: Report):
+    """
+    Validated, type-normalized copy of `raw` (key order kept, defaults
+    appended), or None if it has errors. Unknown fields are kept as they
+    are and reported as warnings.
+    """
+    if not isinstance(raw, dict):
+        report.invalid(where, f"expected an object, got {type(raw).__name__}")
+        return None
+
+    out = {}
+    ok = True
+    for key, value in raw.items():
+        field = schema.get(key)
+        if field is None:
+            report.warning(where, f"unknown field {key!r}")
+            out[key] = value
+            continue
+        if value is None:
+            continue  # same as missing
+        try:
+            out[key] = field.normalize(value)
+        except ValueError as e:
+            report.invalid(where, f"{key}: {e}")
+            ok = False
+
+    for key, field in schema.items():
+        if key in out or not ok:
+            continue
+        if field.required:
+            report.invalid(where, f"missing required field {key!r}")
+            ok = False
+        elif field.default is not _MISSING:
+            out[key] = field.default
+    return out if ok else None
+
+
+# ------------------------------------------------------------------
+# npcs.json
+# ------------------------------------------------------------------
+
+def compile_npcs(npc_file: str, report: Report):
+    """
+    compiled/npcs.json content for `npc_file`, None if it cannot be read.
+    """
+    name = os.path.basename(npc_file)
+    columns = {column: [] for column in models.NPCTable.COLUMNS}
+    seen = {}
+    skipped = 0
+
+    hasher = hashlib.sha256()
+    try:
+        # stat before reading: a file changed meanwhile then fails the
+        # stamp check and gets hashed
+        stat = os.stat(npc_file)
+        for i, raw in enumerate(iter_json_file(npc_file, digest=hasher)):
+            npc_id = raw.get("id") if isinstance(raw, dict) else None
+            where = f"{name}[{i}]" + (f" ({npc_id!r})" if npc_id is not None else "")
+            # the runtime loaders' rules (models.normalize_npc_entry), so a
+            # compiled table ranks exactly like the parsed npcs.json
+            try:
+                entry = dict(zip(models.NPC_FIELDS, models.normalize_npc_entry(raw)))
+            except models._NPC_ENTRY_ERRORS as e:
+                report.invalid(where, str(e))
+                skipped += 1
+                continue
+            for key in raw:
+                if key not in models.NPC_FIELDS:
+                    report.warning(where, f"unknown field {key!r}")
+
+            if entry["name"] != raw["name"].strip():
+                report.warning(where, f"MOD name {raw['name']!r} resolved to {entry['name']!r}")
+            if entry["id"] in seen:
+                # kept, like the loaders do (diff_npc_tables tells them apart by position)
+                report.warning(where, f"repeated id, also used by entry {seen[entry['id']]}")
+            seen.setdefault(entry["id"], i)
+
+            for column in models.NPCTable.COLUMNS:
+                columns[column].append(entry[column])
+    except (OSError, ValueError) as e:
+        report.error(name, f"cannot read: {e}")
+        return None
+
+    columns["is_pirate"] = [1 if p else 0 for p in columns["is_pirate"]]
+    return {
+        "format": COMPILED_FORMAT,
+        "source": {"file": name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": hasher.hexdigest()},
+        "count": len(columns["id"]),
+        "skipped": skipped,
+        "columns": columns,
+    }
+
+
+# ------------------------------------------------------------------
+# Data pack
+# ------------------------------------------------------------------
+
+def _resolve_item_names(section: str, data: dict, report: Report):
+    # every item gets name / name_mod; an alias may only mean one item
+    owners = {}
+    for item_id, item in data.items():
+        item.setdefault("name", item.get("name_en") or item_id)
+        item.setdefault("name_mod", item["name"])
+        for alias in (item_id, item["name"], item["name_mod"], item.get("name_de")):
+            if not alias:
+                continue
+            owner = owners.setdefault(alias.casefold(), item_id)
+            if owner != item_id:
+                report.error(f"{section}[{item_id!r}]", f"alias {alias!r} is also used by {owner!r}")
+
+
+def compile_pack(pack_dir: str, report: Report):
+    """
+    (manifest, {section: data}) of the normalized pack, None if the pack
+    cannot be read.
+    """
+    try:
+        pack = DataPack(pack_dir)
+    except DataPackError as e:
+        report.error("pack", str(e))
+        return None
+
+    item_sections = set(ITEM_SECTIONS.values())
+    manifest_file = os.path.join(pack_dir, "manifest.json")
+    stamps = {"manifest.json": file_stamp(manifest_file)}
+    sources = {"manifest.json": file_fingerprint(manifest_file)}
+    sections = {}
+    for name in pack.section_names():
+        try:
+            raw = pack.section(name)
+        except DataPackError as e:
+            report.error(name, str(e))
+            continue
+        stamps[pack.manifest[name]["file"]] = file_stamp(pack.section_file(name))
+        sources[pack.manifest[name]["file"]] = file_fingerprint(pack.section_file(name))
+
+        schema = PACK_SCHEMAS.get(name)
+        if schema is None:
+            report.warning(name, "no schema, copied unchanged")
+            sections[name] = raw
+            continue
+        data = {}
+        for item_id, item in raw.items():
+            entry = normalize_record(schema, item, f"{name}[{item_id!r}]", report)
+            if entry is not None:
+                data[item_id] = entry
+        if name in item_sections:
+            _resolve_item_names(name, data, report)
+        sections[name] = data
+
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest["compiled"] = {"format": COMPILED_FORMAT, "sources": sources, "stamps": stamps}
+    return manifest, sections
+
+
+# ------------------------------------------------------------------
+# Output
+# ------------------------------------------------------------------
+
+def _write_json(path: str, data, indent=None):
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent, separators=None if indent else (",", ":"))
+        f.write("\n")
+    os.replace(tmp_file, path)
+
+
+def write_compiled(out_dir: str, npcs: dict, pack):
+    pack_out = os.path.join(out_dir, "pack")
+    os.makedirs(pack_out, exist_ok=True)
+
+    _write_json(os.path.join(out_dir, "npcs.json"), npcs)
+
+    # the manifest goes last: without it the compiled pack is never used
+    manifest, sections = pack
+    manifest_file = os.path.join(pack_out, "manifest.json")
+    if os.path.exists(manifest_file):
+        os.remove(manifest_file)
+    for name, data in sections.items():
+        _write_json(os.path.join(pack_out, manifest["sections"][name]["file"]), data, indent=2)
+    _write_json(manifest_file, manifest, indent=2)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Validate and normalize npcs.json and the data pack.")
+    parser.add_argument("--check", action="store_true", help="only validate, write nothing")
+    parser.add_argument("--lenient", action="store_true", help="drop invalid entries instead of failing")
+    parser.add_argument("--strict", action="store_true", help="fail on warnings too")
+    parser.add_argument("-o", "--output", help="output folder (default: data/compiled)")
+    args = parser.parse_args(argv)
+
+    report = Report(lenient=args.lenient)
+    npc_file = models._get_npc_file()[0]
+    npcs = compile_npcs(npc_file, report)
+    pack = compile_pack(get_pack_dir(), report)
+
+    for line in report.warnings:
+        print("warning:", line, file=sys.stderr)
+    for line in report.errors:
+        print("error:", line, file=sys.stderr)
+
+    failed = bool(report.errors) or (args.strict and bool(report.warnings))
+    summary = f"{len(report.errors)} errors, {len(report.warnings)} warnings"
+    if npcs is not None:
+        summary = f"{npcs['count']} NPCs ({npcs['skipped']} dropped), " + summary
+    if failed or args.check or npcs is None or pack is None:
+        print(f"[compile_data] {summary}; nothing written", file=sys.stderr)
+        return 1 if failed or npcs is None or pack is None else 0
+
+    out_dir = args.output or get_compiled_dir()
+    write_compiled(out_dir, npcs, pack)
+    print(f"[compile_data] {summary}; written to {out_dir}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt
 
 from . import models
+from .names import get_name_index
+from .scheduler import get_scheduler
 
 
 class DamagePage(QWidget):
@@ -23,47 +25,14 @@ class DamagePage(QWidget):
         self.app_state = app_state
         self.name_style = name_style
 
-        self.state = {
-            "laser_groups": [
-                {"type": "LW3", "count": 10, "upgrade": 0},
-                {"type": "LW4", "count": 0, "upgrade": 0},
-                {"type": "LW4U", "count": 0, "upgrade": 0},
-            ],
-            "ammo": "LPC11",
-            "target_is_pirate": False,
-            "npc_hp": 250000,
-            "drones": {
-                "IRIS": {"count": 8, "level": 16, "design": "NONE", "lasers_per_drone": 2},
-                "APIS": {"count": 0, "level": 16, "design": "NONE", "lasers_per_drone": 2},
-                "ZEUS": {"count": 0, "level": 16, "design": "NONE", "lasers_per_drone": 2},
-            },
-            # aggregated: how many of each laser type sit on drones
-            "lasers_on_drones_by_type": {
-                "LW3": 0,
-                "LW4": 0,
-                "LW4U": 0,
-                "PRL": 0,
-            },
-            "skills": {
-                "missile_targeting": 0,
-                "rocket_engineering": 0,
-                "saturn_conqueror": 0,
-                "bounty_hunter": 0,
-            },
-            "formation": "NONE",
-            "damage_booster": 0.0,  # 0, 0.10, 0.20, 0.25
-            "language": "EN",
-            "rockets": {
-                "type": "NONE",
-            },
-            "rocket_launcher": {
-                "launcher_type": "NONE",
-                "rocket_type": "ECO10",
-                "target_is_saturn": False,
-            },
-        }
+        self.state = models.default_damage_state()
+
+        # cached sub-results of the damage model; None = needs recompute
+        self._parts = {"laser": None, "standard": None, "launcher": None}
+        self._refresh_key = get_scheduler().register(self._refresh)
 
         self._build_ui()
+        self.set_name_style(self.name_style)
         self._update_drone_slots_info()
         self.recalculate()
 
@@ -530,6 +499,27 @@ class DamagePage(QWidget):
 
         self.tabs.addTab(w, "Modifiers")
 
+    # ------------------- Name style -------------------
+
+    def set_name_style(self, style: str):
+        """
+        Vanilla / MOD item names; only the combo texts change, the ids
+        (userData) and the selection stay.
+        """
+        self.name_style = style
+        names = get_name_index()
+        combos = [("laser", cmb) for cmb in self.laser_type_boxes] + [
+            ("ammo", self.cmb_ammo),
+            ("rocket", self.cmb_rocket),
+            ("launcher", self.cmb_launcher),
+            ("rl_rocket", self.cmb_launcher_rocket),
+        ]
+        for kind, cmb in combos:
+            display = names.display_names(kind, style)
+            for i in range(cmb.count()):
+                item_id = cmb.itemData(i)
+                cmb.setItemText(i, display.get(item_id, cmb.itemText(i)))
+
     # ------------------- State handlers -------------------
 
     def _on_laser_group_changed(self):
@@ -537,11 +527,11 @@ class DamagePage(QWidget):
             self.state["laser_groups"][idx]["type"] = self.laser_type_boxes[idx].currentData()
             self.state["laser_groups"][idx]["count"] = self.laser_count_boxes[idx].value()
             self.state["laser_groups"][idx]["upgrade"] = self.laser_upgrade_boxes[idx].value()
-        self.recalculate()
+        self._invalidate("laser")
 
     def _on_npc_hp_changed(self, value: int):
         self.state["npc_hp"] = value
-        self.recalculate()
+        self._invalidate()  # TTK only
 
     def _on_drones_changed(self):
         for drone_id, ctrls in self.drone_controls.items():
@@ -549,7 +539,7 @@ class DamagePage(QWidget):
             self.state["drones"][drone_id]["level"] = ctrls["level"].value()
             self.state["drones"][drone_id]["design"] = ctrls["design"].currentData()
         self._update_drone_slots_info()
-        self.recalculate()
+        self._invalidate("laser", "standard", "launcher")
 
     def _on_lasers_on_drones_changed(self, _value: int):
         self.state["lasers_on_drones_by_type"]["LW3"] = self.spn_lw3_on_drones.value()
@@ -557,7 +547,7 @@ class DamagePage(QWidget):
         self.state["lasers_on_drones_by_type"]["LW4U"] = self.spn_lw4u_on_drones.value()
         self.state["lasers_on_drones_by_type"]["PRL"] = self.spn_prl_on_drones.value()
         self._update_drone_slots_info()
-        self.recalculate()
+        self._invalidate("laser")
 
     def _update_drone_slots_info(self):
         """
@@ -591,47 +581,85 @@ class DamagePage(QWidget):
 
     def _on_ammo_changed(self, _idx: int):
         self.state["ammo"] = self.cmb_ammo.currentData()
-        self.recalculate()
+        self._invalidate("laser")
 
     def _on_target_flags_changed(self, _state: int):
         self.state["target_is_pirate"] = self.chk_pirate.isChecked()
-        self.recalculate()
+        self._invalidate("laser")
 
     def _on_rocket_changed(self, _idx: int):
         self.state["rockets"]["type"] = self.cmb_rocket.currentData()
-        self.recalculate()
+        self._invalidate("standard")
 
     def _on_launcher_changed(self, _idx: int):
         self.state["rocket_launcher"]["launcher_type"] = self.cmb_launcher.currentData()
-        self.recalculate()
+        self._invalidate("launcher")
 
     def _on_launcher_rocket_changed(self, _idx: int):
         self.state["rocket_launcher"]["rocket_type"] = self.cmb_launcher_rocket.currentData()
-        self.recalculate()
+        self._invalidate("launcher")
 
     def _on_saturn_target_changed(self, _state: int):
         self.state["rocket_launcher"]["target_is_saturn"] = self.chk_saturn.isChecked()
-        self.recalculate()
+        self._invalidate("launcher")
 
     def _on_formation_changed(self, _idx: int):
         self.state["formation"] = self.cmb_formation.currentData()
-        self.recalculate()
+        self._invalidate("laser", "standard", "launcher")
 
     def _on_booster_changed(self, _idx: int):
         self.state["damage_booster"] = float(self.cmb_booster.currentData())
-        self.recalculate()
+        self._invalidate()  # details text only
 
     def _on_skills_changed(self):
+        changed = set()
         for key, spn in self.skill_spinboxes.items():
+            if self.state["skills"].get(key) != spn.value():
+                changed.add(key)
             self.state["skills"][key] = spn.value()
-        self.recalculate()
+
+        parts = set()
+        if "saturn_conqueror" in changed:
+            parts.add("laser")
+        if "rocket_engineering" in changed:
+            parts.update(("standard", "launcher"))
+        if "missile_targeting" in changed:
+            parts.add("standard")
+        self._invalidate(*parts)
 
     # ------------------- Calculation -------------------
 
-    
+    def _invalidate(self, *parts):
+        """
+        Mark model parts ("laser", "standard", "launcher") as stale and
+        schedule one refresh for the next event-loop tick. Bursts of widget
+        signals (e.g. dragging a spinbox) collapse into a single refresh.
+        """
+        for part in parts:
+            self._parts[part] = None
+        get_scheduler().request(self._refresh_key)
+
+    def _refresh(self):
+        if self._parts["laser"] is None:
+            self._parts["laser"] = models._laser_damage_per_second(self.state)
+        if self._parts["standard"] is None:
+            self._parts["standard"] = models._standard_rocket_dps(self.state)
+        if self._parts["launcher"] is None:
+            self._parts["launcher"] = models._rocket_launcher_dps(self.state)
+
+        result = models.overview_from_parts(
+            self._parts["laser"],
+            self._parts["standard"] + self._parts["launcher"],
+            self.state.get("npc_hp", 0),
+        )
+        self._show_result(result)
+
     def recalculate(self):
-        result = models.calculate_damage_overview(self.state)
+        for part in self._parts:
+            self._parts[part] = None
+        self._refresh()
 
+    def _show_result(self, result: dict):
         # Save last result for Farming Guide
         if self.app_state is not None:
             self.app_state["last_damage_state"] = dict(self.state)
@@ -0,0 +1,263 @@
+"""
+Versioned game data pack (lasers, ammo, drones, formations, rockets, ...).
+
+The pack is a folder with a manifest and one JSON file per section:
+
+    data/pack/manifest.json
+        {"format": 1, "version": 3,
+         "sections": {"lasers": {"file": "lasers.json", "title": "Lasers", "title_de": "Laser"}, ...}}
+    data/pack/lasers.json
+        {"LW3": {"name_en": "LW-3 (LF-3)", ...}, ...}
+
+Sections are only read when they are first asked for, so sections that
+just the Wiki needs (ships, items, maps, ...) cost nothing until the Wiki
+is opened. All pages share one DataPack (get_data_pack()) and with it the
+already loaded sections. Module-level tables (models.LASERS, ...) are
+PackSection views, so importing a module never reads the pack either; a
+missing or broken pack raises DataPackError where it is first used.
+
+In the EXE build the pack folder sits next to SpaceAcesCompanion.exe
+(see build.bat), like npcs.json; the copy built into the EXE is used when
+it is missing there.
+
+`python -m sac_pages.compile_data` writes a validated, type-normalized copy
+of the pack to compiled/pack (see compile_data). get_data_pack() uses it as
+long as the fingerprints of the source files recorded in it still match;
+otherwise the source pack is read as before. Sources whose size and mtime
+are unchanged since the compile are not re-hashed.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections.abc import Mapping
+
+from . import profiling
+
+
+# highest manifest "format" this code understands
+PACK_FORMAT = 1
+
+
+class DataPackError(Exception):
+    pass
+
+
+def get_data_dir() -> str:
+    if getattr(sys, "frozen", False):
+        # Running as bundled EXE -> data files next to the .exe
+        return os.path.dirname(sys.executable)
+    here = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(os.path.dirname(here), "data")
+
+
+def get_pack_dir() -> str:
+    pack_dir = os.path.join(get_data_dir(), "pack")
+    bundled = getattr(sys, "_MEIPASS", None)
+    if bundled and not os.path.isdir(pack_dir):
+        # EXE without pack/ next to it: the copy built into it (build.bat --add-data)
+        return os.path.join(bundled, "pack")
+    return pack_dir
+
+
+def get_compiled_dir() -> str:
+    return os.path.join(get_data_dir(), "compiled")
+
+
+def file_fingerprint(path: str):
+    """
+    [size, sha256] of a file, None if it cannot be read.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return [os.path.getsize(path), digest.hexdigest()]
+
+
+def file_stamp(path: str):
+    """
+    [size, mtime_ns] of a file, None if it cannot be stat'ed.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def fingerprint_matches(path: str, fingerprint, stamp=None) -> bool:
+    """
+    Whether `path` still has `fingerprint` ([size, sha256]).
+
+    `stamp` is the [size, mtime_ns] taken when the fingerprint was; while
+    it still matches, the file is not hashed. A changed size never needs
+    the hash either, so only touched-but-same-size files are read.
+    """
+    current = file_stamp(path)
+    if current is None or not fingerprint:
+        return file_fingerprint(path) == fingerprint
+    if current[0] != fingerprint[0]:
+        return False
+    if current == stamp:
+        return True
+    return file_fingerprint(path) == fingerprint
+
+
+def _compiled_pack_is_current(compiled_dir: str, source_dir: str) -> bool:
+    try:
+        with open(os.path.join(compiled_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            compiled = json.load(f)["compiled"]
+        sources = compiled["sources"]
+        stamps = compiled.get("stamps", {})
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return False
+    if not os.path.isdir(source_dir):
+        return True  # shipped without the sources
+    return all(
+        fingerprint_matches(os.path.join(source_dir, name), fp, stamps.get(name))
+        for name, fp in sources.items()
+    )
+
+
+def get_runtime_pack_dir() -> str:
+    """
+    compiled/pack if it is up to date with pack/, else pack/.
+    """
+    compiled_dir = os.path.join(get_compiled_dir(), "pack")
+    source_dir = get_pack_dir()
+    if _compiled_pack_is_current(compiled_dir, source_dir):
+        return compiled_dir
+    return source_dir
+
+
+class DataPack:
+    def __init__(self, pack_dir: str):
+        self.pack_dir = pack_dir
+        self._sections = {}
+        self._lock = threading.Lock()
+
+        manifest_file = os.path.join(pack_dir, "manifest.json")
+        try:
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            raise DataPackError(f"cannot read data pack manifest {manifest_file}: {e!r}") from e
+
+        fmt = manifest.get("format")
+        if not isinstance(fmt, int) or fmt > PACK_FORMAT:
+            raise DataPackError(f"unsupported data pack format {fmt!r} in {manifest_file}")
+
+        self.format = fmt
+        self.version = manifest.get("version")
+        self.manifest = manifest.get("sections", {})
+        self.compiled = "compiled" in manifest
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.manifest
+
+    def section_names(self) -> list:
+        return list(self.manifest)
+
+    def title(self, name: str, lang: str = "en") -> str:
+        info = self.manifest[name]
+        title = info.get("title", name)
+        return info.get("title_de", title) if lang == "de" else title
+
+    def section_file(self, name: str) -> str:
+        try:
+            return os.path.join(self.pack_dir, self.manifest[name]["file"])
+        except KeyError:
+            raise DataPackError(f"data pack has no section {name!r}") from None
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._sections
+
+    def section(self, name: str) -> dict:
+        """
+        Entries of one section (id -> dict), loaded on first use. The dict
+        is shared, treat it as read-only.
+        """
+        data = self._sections.get(name)
+        if data is not None:
+            return data
+        with self._lock:
+            data = self._sections.get(name)
+            if data is None:
+                data = self._sections[name] = self._load(name)
+        return data
+
+    def get(self, name: str, key: str, default=None):
+        return self.section(name).get(key, default)
+
+    def _load(self, name: str) -> dict:
+        path = self.section_file(name)
+        with profiling.span(f"data pack: {name}"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                raise DataPackError(f"cannot read data pack section {name!r} ({path}): {e!r}") from e
+        if not isinstance(data, dict):
+            raise DataPackError(f"data pack section {name!r} must be a JSON object")
+        return data
+
+
+_data_pack = None
+_data_pack_lock = threading.Lock()
+
+
+def get_data_pack() -> DataPack:
+    """
+    Process-wide DataPack from get_runtime_pack_dir().
+    """
+    global _data_pack
+    with _data_pack_lock:
+        if _data_pack is None:
+            _data_pack = DataPack(get_runtime_pack_dir())
+        return _data_pack
+
+
+class PackSection(Mapping):
+    """
+    Read-only view of one section of get_data_pack(), loaded on first access.
+
+    Modules can declare their tables at import time (models.LASERS, ...)
+    without reading any file; a missing or broken pack raises DataPackError
+    where the table is first used instead of during the import.
+    """
+
+    __slots__ = ("name", "_data")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._data = None
+
+    def _entries(self) -> dict:
+        data = self._data
+        if data is None:
+            data = self._data = get_data_pack().section(self.name)
+        return data
+
+    def __getitem__(self, key):
+        return self._entries()[key]
+
+    def __iter__(self):
+        return iter(self._entries())
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries()
+
+    def get(self, key, default=None):
+        return self._entries().get(key, default)
+
+    def __repr__(self) -> str:
+        return f"PackSection({self.name!r})"
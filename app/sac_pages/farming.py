@@ -0,0 +1,548 @@
+"""
+Farming rankings over whole DPS ranges.
+
+suggest_best_npcs() answers "what should I farm at this DPS". This module
+answers it for a range of DPS values at once (e.g. for the clan's
+"what to farm at your DPS" tables): every DPS value is scored once, its
+top-N NPCs are kept, and the DPS steps where the best NPC changes are
+reported as breakpoints.
+
+From code:
+
+    from sac_pages import farming
+
+    surface = farming.RankingSurface(farming.dps_range(5000, 500000, 1000), npcs)
+    surface.ranking(0)   # same as suggest_best_npcs(5000, npcs, top_n=10)
+    surface.breakpoints()
+
+For many lookups with a small top_n at changing DPS (the Farming Guide's
+top-N views, a slider, the clan tables above) a BreakpointIndex keeps the
+top_n NPCs per DPS interval: they only change where two NPC scores cross,
+so a lookup inside a known interval is a binary search. The first lookup
+in a new interval still costs one scoring pass.
+
+From the command line (run inside app/):
+
+    python -m sac_pages.farming --start 5000 --stop 500000 --step 1000 -o farming.json
+"""
+
+import argparse
+import bisect
+import json
+import math
+import sys
+import threading
+from array import array
+
+from . import models
+
+
+def dps_range(start: float, stop: float, step: float) -> list:
+    """
+    start, start + step, ... up to and including stop.
+    """
+    if step <= 0:
+        raise ValueError("step must be > 0")
+    count = int((stop - start) / step + 1e-9) + 1
+    return [start + i * step for i in range(max(0, count))]
+
+
+class RankingSurface:
+    """
+    Top-N order of the NPCs at every DPS value, computed once.
+
+    `npcs` / `rows` are the same as for suggest_best_npcs(). Every DPS value
+    is scored once and only its top_n positions (0 = all) and its top choice
+    are kept, so memory grows with DPS values x top_n, not x NPCs. Inputs
+    that would keep more than MAX_CELLS positions raise ValueError. Rankings
+    are identical to calling suggest_best_npcs() per DPS; asking ranking()
+    for more than top_n NPCs scores that DPS value again.
+    """
+
+    MAX_CELLS = 2_000_000
+
+    def __init__(self, dps_values, npcs, search_time: float = 5.0, rows=None, top_n: int = 10):
+        self.dps_values = [float(d) for d in dps_values]
+        self.search_time = models._clamp_search_time(search_time)
+        self._hps, self._uris, self._npc_at = models._ranking_columns(npcs, rows)
+        self.top_n = max(0, top_n)
+
+        kept = min(self.top_n, len(self._hps)) if self.top_n else len(self._hps)
+        if len(self.dps_values) * kept > self.MAX_CELLS:
+            raise ValueError(
+                f"{len(self.dps_values):,} DPS values x {kept:,} NPCs exceed "
+                f"RankingSurface.MAX_CELLS ({self.MAX_CELLS:,}); use a smaller top_n or DPS range"
+            )
+
+        self._orders = []  # per DPS value: array of NPC positions, best first
+        self._top = []     # per DPS value: best position, None where nothing gives uri
+        for dps in self.dps_values:
+            if dps <= 0 or not self._hps:
+                self._orders.append(array("q"))
+                self._top.append(None)
+                continue
+            scores = self._scores(dps)
+            order = models._rank_order(scores, self.top_n)
+            self._orders.append(array("q", order))
+            # first of equal scores, like the stable sort
+            self._top.append(order[0] if scores[order[0]] > 0 else None)
+
+    def __len__(self) -> int:
+        return len(self.dps_values)
+
+    def _scores(self, dps: float) -> list:
+        return models._farming_scores(dps, self._hps, self._uris, self.search_time)
+
+    def ranking(self, index: int, top_n: int | None = None) -> list:
+        """
+        suggest_best_npcs() result for dps_values[index] (top_n defaults to
+        the surface's top_n).
+        """
+        dps = self.dps_values[index]
+        if dps <= 0 or not self._hps:
+            return []
+        if top_n is None:
+            top_n = self.top_n
+        order = self._orders[index]
+        if len(order) == len(self._hps) or 0 < top_n <= len(order):
+            # nlargest(k) is a prefix of nlargest(n) for k <= n
+            order = order[:top_n] if top_n else order
+        else:
+            order = models._rank_order(self._scores(dps), top_n)
+        return [
+            models._farming_entry(self._npc_at(k), self._hps[k], self._uris[k], dps, self.search_time)
+            for k in order
+        ]
+
+    def rankings(self, top_n: int | None = None) -> list:
+        return [self.ranking(i, top_n) for i in range(len(self.dps_values))]
+
+    def top_choices(self) -> list:
+        """
+        Position (in the NPC input) of the best NPC per DPS value, None where
+        nothing gives uri.
+        """
+        return list(self._top)
+
+    def breakpoints(self) -> list:
+        """
+        DPS steps where the top choice changes:
+        [{"dps", "previous_dps", "npc", "previous"}, ...] with NPCs or None.
+        """
+        result = []
+        choices = self.top_choices()
+        for i in range(1, len(choices)):
+            if choices[i] == choices[i - 1]:
+                continue
+            result.append({
+                "dps": self.dps_values[i],
+                "previous_dps": self.dps_values[i - 1],
+                "npc": self._npc(choices[i]),
+                "previous": self._npc(choices[i - 1]),
+            })
+        return result
+
+    def _npc(self, position):
+        return None if position is None else self._npc_at(position)
+
+
+def rank_dps_range(dps_values, npcs, search_time: float = 5.0, top_n: int = 10, rows=None) -> dict:
+    """
+    {"dps": [...], "rankings": [[entry, ...] per DPS], "breakpoints": [...]}
+    with entries as returned by suggest_best_npcs().
+    """
+    surface = RankingSurface(dps_values, npcs, search_time, rows, top_n)
+    return {
+        "dps": surface.dps_values,
+        "rankings": surface.rankings(top_n),
+        "breakpoints": surface.breakpoints(),
+    }
+
+
+# ------------------------------------------------------------------
+# Breakpoint index
+# ------------------------------------------------------------------
+#
+# With hp h, uri u and search time s, an NPC's score at DPS d is
+# C * d**k / (h + s*d) on five DPS segments (TTK = h/d):
+#
+#   TTK > 225 s           penalty 0.2      C = 720 u,         k = 1
+#   45 s < TTK <= 225 s   penalty 45/TTK   C = 162000 u / h,  k = 2
+#   3 s <= TTK <= 45 s    no penalty       C = 3600 u,        k = 1
+#   0.6 s <= TTK < 3 s    penalty TTK/3    C = 1200 u h,      k = 0
+#   TTK < 0.6 s           penalty 0.2      C = 720 u,         k = 1
+#
+# Two scores are equal where Ci d^ki (hj + s d) = Cj d^kj (hi + s d), a
+# polynomial of degree <= 3 in d, so all crossings can be found exactly.
+
+_TTK_BOUNDS = (225.0, 45.0, 3.0, 0.6)
+
+
+def _score_segments(hp: int, uri: int) -> tuple:
+    """
+    (DPS bounds, [(C, k), ...]) for one NPC; segment n covers
+    bounds[n-1] .. bounds[n].
+    """
+    bounds = tuple(hp / ttk for ttk in _TTK_BOUNDS)
+    forms = (
+        (720.0 * uri, 1),
+        (162000.0 * uri / hp, 2),
+        (3600.0 * uri, 1),
+        (1200.0 * uri * hp, 0),
+        (720.0 * uri, 1),
+    )
+    return bounds, forms
+
+
+def _poly_eval(coeffs: list, x: float) -> float:
+    value = 0.0
+    for c in reversed(coeffs):
+        value = value * x + c
+    return value
+
+
+def _poly_roots(coeffs: list, lo: float, hi: float) -> list:
+    """
+    Real roots in [lo, hi] of sum(coeffs[p] * x**p), degree <= 3.
+    """
+    while coeffs and coeffs[-1] == 0.0:
+        coeffs = coeffs[:-1]
+    if len(coeffs) < 2:
+        return []
+
+    if math.isinf(hi):
+        # Cauchy bound: all roots lie below it
+        hi = 1.0 + max(abs(c / coeffs[-1]) for c in coeffs[:-1])
+        if hi <= lo:
+            return []
+
+    # split at the critical points, so p is monotone on every piece
+    splits = [lo, hi]
+    deriv = [p * c for p, c in enumerate(coeffs)][1:]
+    while deriv and deriv[-1] == 0.0:
+        deriv.pop()
+    if len(deriv) == 2:
+        splits.append(-deriv[0] / deriv[1])
+    elif len(deriv) == 3:
+        a, b, c = deriv[2], deriv[1], deriv[0]
+        disc = b * b - 4.0 * a * c
+        if disc >= 0.0:
+            root = math.sqrt(disc)
+            splits += [(-b - root) / (2.0 * a), (-b + root) / (2.0 * a)]
+    splits = sorted(x for x in set(splits) if lo <= x <= hi)
+
+    roots = []
+    for a, b in zip(splits, splits[1:]):
+        fa, fb = _poly_eval(coeffs, a), _poly_eval(coeffs, b)
+        if fa == 0.0:
+            roots.append(a)
+        if fb == 0.0:
+            roots.append(b)
+        if fa == 0.0 or fb == 0.0 or (fa < 0.0) == (fb < 0.0):
+            continue
+        while True:
+            mid = 0.5 * (a + b)
+            if mid <= a or mid >= b:
+                break
+            fm = _poly_eval(coeffs, mid)
+            if fm == 0.0:
+                a = b = mid
+                break
+            if (fm < 0.0) == (fa < 0.0):
+                a, fa = mid, fm
+            else:
+                b = mid
+        roots.append(0.5 * (a + b))
+    return roots
+
+
+def _peak_score(hp: int, uri: int, search_time: float) -> float:
+    # highest score over all DPS: at TTK = 3 s, or towards infinite DPS
+    # where the 0.2 overkill floor gives 720 u / s
+    peak = 3600.0 * uri / (3.0 + search_time)
+    if search_time <= 0.0:
+        return math.inf
+    return max(peak, 720.0 * uri / search_time)
+
+
+def _crossings(seg_i: tuple, seg_j: tuple, hp_i: int, hp_j: int, search_time: float,
+               lo: float = 0.0, hi: float = math.inf, ties=None) -> list:
+    # DPS values in [lo, hi] where the two scores become equal; pieces
+    # where they are equal throughout are also added to `ties` as (lo, hi)
+    inner = tuple(b for b in seg_i[0] + seg_j[0] if lo < b < hi)
+    bounds = sorted(set((lo,) + inner + (hi,)))
+    result = []
+    for lo, hi in zip(bounds, bounds[1:]):
+        mid = lo * 2.0 if math.isinf(hi) else 0.5 * (lo + hi)
+        ci, ki = seg_i[1][bisect.bisect_right(seg_i[0], mid)]
+        cj, kj = seg_j[1][bisect.bisect_right(seg_j[0], mid)]
+        # Ci d^ki (hj + s d) - Cj d^kj (hi + s d), divided by d^min(ki, kj)
+        low = min(ki, kj)
+        coeffs = [0.0] * 4
+        coeffs[ki - low] += ci * hp_j
+        coeffs[ki - low + 1] += ci * search_time
+        coeffs[kj - low] -= cj * hp_i
+        coeffs[kj - low + 1] -= cj * search_time
+        scale = max(abs(ci) * max(hp_j, search_time), abs(cj) * max(hp_i, search_time))
+        if max(abs(c) for c in coeffs) <= 1e-12 * scale:
+            # equal on the whole piece (search time 0, both at TTK 0.6-3 s):
+            # the tie, and so the order, can change at its ends
+            result += [d for d in (lo, hi) if 0.0 < d < math.inf]
+            if ties is not None:
+                ties.append((lo, hi))
+            continue
+        result += [d for d in _poly_roots(coeffs, lo, hi) if d > 0.0]
+    return result
+
+
+class BreakpointIndex:
+    """
+    suggest_best_npcs() top_n results, cached per DPS interval.
+
+    A lookup at a DPS that no cached interval covers scores all NPCs once
+    (like suggest_best_npcs()) and then works out how far the same NPCs
+    stay the top_n: up to the nearest DPS where one of them is crossed by
+    an NPC outside. Only NPCs whose best score on the interval reaches a
+    member's worst are solved for, so a miss costs about one direct
+    ranking plus a few polynomial solves. A lookup inside a cached interval
+    is a binary search plus top_n entries, built and sorted with the exact
+    scoring code, so results equal suggest_best_npcs() (right at a
+    crossing it re-scores).
+
+    Intervals reach at most SPAN times below / above the DPS that created
+    them and at most MAX_INTERVALS are kept. With top_n = 0 (the full
+    order) or more than MAX_ROWS NPCs every lookup is plain
+    suggest_best_npcs(). Lookups may come from several threads.
+    """
+
+    # relative distance to a crossing below which lookup() re-scores
+    EPSILON = 1e-9
+    SPAN = 1.1
+    MAX_INTERVALS = 4096
+    MAX_ROWS = 20000
+
+    def __init__(self, npcs, search_time: float = 5.0, rows=None, top_n: int = 10):
+        self.npcs = npcs
+        self.rows = rows
+        self.top_n = top_n
+        self.search_time = models._clamp_search_time(search_time)
+        self._hps, self._uris, self._npc_at = models._ranking_columns(npcs, rows)
+        self.enabled = 0 < top_n and len(self._hps) <= self.MAX_ROWS
+        self._lock = threading.Lock()
+
+        self._starts = []     # sorted interval starts
+        self._intervals = []  # (lo, hi, top_n positions), same order as _starts
+        self._segments = {}   # (hp, uri) -> _score_segments(), on demand
+        self._peaks = []
+        self._by_peak = []    # positions with uri, best possible score first
+        if self.enabled:
+            st = self.search_time
+            self._peaks = [_peak_score(hp, uri, st) for hp, uri in zip(self._hps, self._uris)]
+            self._by_peak = sorted(
+                (k for k, uri in enumerate(self._uris) if uri > 0),
+                key=self._peaks.__getitem__, reverse=True,
+            )
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def lookup(self, total_dps: float, top_n: int | None = None) -> list:
+        """
+        suggest_best_npcs(total_dps, npcs, search_time, top_n, rows).
+        """
+        top_n = self.top_n if top_n is None else top_n
+        if total_dps <= 0 or not self._hps:
+            return []
+        if not self.enabled or not top_n or top_n > self.top_n:
+            return models.suggest_best_npcs(total_dps, self.npcs, self.search_time, top_n, self.rows)
+
+        with self._lock:
+            order = self._cached_order(total_dps)
+            if order is None:
+                order = self._add_interval(total_dps)
+        # input order + stable sort: ties rank like in suggest_best_npcs()
+        entries = [
+            models._farming_entry(self._npc_at(k), self._hps[k], self._uris[k], total_dps, self.search_time)
+            for k in sorted(order)
+        ]
+        entries.sort(key=lambda e: e["score"], reverse=True)
+        return entries[:top_n]
+
+    # ------------------- Internals -------------------
+
+    def _cached_order(self, dps: float):
+        i = bisect.bisect_right(self._starts, dps) - 1
+        if i < 0:
+            return None
+        lo, hi, order = self._intervals[i]
+        near = self.EPSILON * dps
+        if lo + near < dps < hi - near:
+            return order
+        return None
+
+    def _add_interval(self, dps: float) -> list:
+        scores = models._farming_scores(dps, self._hps, self._uris, self.search_time)
+        order = models._rank_order(scores, self.top_n)
+        lo, hi = self._order_interval(dps, order)
+
+        # keep the intervals disjoint, so the one left of dps is the only candidate
+        i = bisect.bisect_right(self._starts, dps)
+        if i > 0:
+            lo = max(lo, self._intervals[i - 1][1])
+        if i < len(self._starts):
+            hi = min(hi, self._starts[i])
+        near = self.EPSILON * dps
+        if not lo + near < dps < hi - near:
+            return order  # right at a crossing: not cached
+
+        if len(self._intervals) >= self.MAX_INTERVALS:
+            self._starts, self._intervals = [], []
+            i = 0
+        self._starts.insert(i, lo)
+        self._intervals.insert(i, (lo, hi, order))
+        return order
+
+    def _crossings(self, a: int, b: int, lo: float, hi: float, ties=None) -> list:
+        key_a = (self._hps[a], self._uris[a])
+        key_b = (self._hps[b], self._uris[b])
+        if key_a == key_b or key_a[1] <= 0 or key_b[1] <= 0:
+            return []  # same curve, or a zero score that no other curve meets
+        for key in (key_a, key_b):
+            if key not in self._segments:
+                self._segments[key] = _score_segments(*key)
+        return _crossings(self._segments[key_a], self._segments[key_b], key_a[0], key_b[0],
+                          self.search_time, lo, hi, ties)
+
+    def _score_range(self, k: int, lo: float, hi: float) -> tuple:
+        # scores rise up to TTK = 3 s, fall to TTK = 0.6 s and rise again,
+        # so (min, max) on [lo, hi] is taken at the ends or at these turns
+        points = [lo, hi] + [self._hps[k] / ttk for ttk in (3.0, 0.6) if lo < self._hps[k] / ttk < hi]
+        hp, uri = [self._hps[k]], [self._uris[k]]
+        scores = [models._farming_scores(d, hp, uri, self.search_time)[0] for d in points]
+        return min(scores), max(scores)
+
+    def _order_interval(self, dps: float, order: list) -> tuple:
+        """
+        (lo, hi) around dps on which the NPCs in `order` stay the top_n
+        (their order among each other may change; lookup() re-sorts).
+        """
+        lo, hi = dps / self.SPAN, dps * self.SPAN
+
+        def narrow(a, b):
+            # a is in the top_n at dps, b is not
+            nonlocal lo, hi
+            ties = []
+            for d in self._crossings(a, b, lo, hi, ties):
+                if d <= dps:
+                    lo = max(lo, d)
+                else:
+                    hi = min(hi, d)
+            if any(t_lo <= dps <= t_hi for t_lo, t_hi in ties):
+                # tied scores: the direct ranking's pick is rounding noise
+                lo = hi = dps
+
+        # fewer NPCs than top_n, or one of them scores 0 (then so does
+        # everything outside): nothing can move in
+        if len(order) < self.top_n or min(self._uris[k] for k in order) <= 0:
+            return lo, hi
+
+        # only NPCs that reach some member's score on [lo, hi] can move
+        # in; the rest never has to be solved for
+        worst = {k: self._score_range(k, lo, hi)[0] * (1.0 - self.EPSILON) for k in order}
+        floor = min(worst.values())
+        in_order = set(order)
+        candidates = []
+        for k in self._by_peak:
+            if self._peaks[k] < floor:
+                break
+            if k not in in_order:
+                candidates.append(k)
+        hps = [self._hps[k] for k in candidates]
+        uris = [self._uris[k] for k in candidates]
+        at_lo = models._farming_scores(lo, hps, uris, self.search_time)
+        at_hi = models._farming_scores(hi, hps, uris, self.search_time)
+        top = 3600.0 / (3.0 + self.search_time)
+        for n, k in enumerate(candidates):
+            best = max(at_lo[n], at_hi[n])
+            if lo < self._hps[k] / 3.0 < hi:
+                best = max(best, top * self._uris[k])
+            for m in order:
+                if best < worst[m]:
+                    continue
+                # the window may have shrunk since: check again on it first
+                if self._score_range(k, lo, hi)[1] < self._score_range(m, lo, hi)[0] * (1.0 - self.EPSILON):
+                    continue
+                narrow(m, k)
+                if lo >= hi:
+                    return lo, hi
+        return lo, hi
+
+
+# ------------------------------------------------------------------
+# Command line
+# ------------------------------------------------------------------
+
+def _npc_json(npc):
+    if npc is None:
+        return None
+    return {"id": npc.id, "name": npc.name, "map": npc.map}
+
+
+def _entry_json(entry: dict) -> dict:
+    row = _npc_json(entry["npc"])
+    for key in ("hp", "ttk", "cycle_time", "uri", "uri_per_hour", "score"):
+        row[key] = entry[key]
+    return row
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rank NPCs for a range of DPS values.")
+    parser.add_argument("--start", type=float, default=5000.0)
+    parser.add_argument("--stop", type=float, default=500000.0)
+    parser.add_argument("--step", type=float, default=1000.0)
+    parser.add_argument("--top", type=int, default=10, help="NPCs per DPS value (0 = all)")
+    parser.add_argument("--map", default="", help="only NPCs on this map")
+    parser.add_argument("--search-time", type=float, default=5.0)
+    parser.add_argument("-o", "--output", help="write JSON here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    repo = models.get_npc_repository()
+    try:
+        ranked = rank_dps_range(
+            dps_range(args.start, args.stop, args.step),
+            repo.table,
+            search_time=args.search_time,
+            top_n=args.top,
+            rows=repo.filter_rows(map_id=args.map or None),
+        )
+    except ValueError as e:
+        print(f"[farming] {e}", file=sys.stderr)
+        return 2
+    report = {
+        "search_time": args.search_time,
+        "map": args.map,
+        "dps": ranked["dps"],
+        "rankings": [[_entry_json(e) for e in entries] for entries in ranked["rankings"]],
+        "breakpoints": [
+            {
+                "dps": bp["dps"],
+                "previous_dps": bp["previous_dps"],
+                "npc": _npc_json(bp["npc"]),
+                "previous": _npc_json(bp["previous"]),
+            }
+            for bp in ranked["breakpoints"]
+        ],
+    }
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        json.dump(report, out, indent=2, ensure_ascii=False)
+        out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
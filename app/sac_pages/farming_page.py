@@ -1,3 +1,5 @@
+import functools
+import threading
 
 from PySide6.QtWidgets import (
     QWidget,
@@ -6,13 +8,180 @@ from PySide6.QtWidgets import (
     QLabel,
     QComboBox,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
+    QAbstractItemView,
     QGroupBox,
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
 
 from . import models
+from .farming import BreakpointIndex
+from .logs import get_logger
+from .names import get_name_index
+from .scheduler import get_scheduler
+
+
+log = get_logger("farming")
+
+# "Show" choices: rows in the table, 0 = every NPC of the map
+TOP_N_CHOICES = (10, 50, 0)
+DEFAULT_TOP_N = 50
+
+
+def _rating_for(uri_per_min: float, max_uri_per_min: float) -> str:
+    if max_uri_per_min <= 0:
+        return "-"
+    ratio = uri_per_min / max_uri_per_min
+    if ratio >= 0.9:
+        return "A+"
+    if ratio >= 0.75:
+        return "A"
+    if ratio >= 0.6:
+        return "B"
+    if ratio >= 0.4:
+        return "C"
+    if ratio >= 0.2:
+        return "D"
+    return "F"
+
+
+class FarmingTableModel(QAbstractTableModel):
+    """
+    Ranking results (suggest_best_npcs() entries) as a table model.
+
+    Cells are formatted when the view asks for them, so only visible rows
+    cost anything. sort(-1) restores the ranking order.
+    """
+
+    HEADERS = ["NPC", "Map", "HP + Shield", "Uri / kill", "TTK (s)", "Uri / min", "Rating"]
+    COL_NAME = 0
+    NUMERIC_COLS = (2, 3, 4, 5)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries = []
+        self._order = []       # row -> entry index
+        self._name_of = None   # NPCRow -> display name
+        self._max_uri_per_min = 0.0
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+
+    # ------------------- Data -------------------
+
+    def set_results(self, entries: list):
+        self.beginResetModel()
+        self._entries = entries
+        self._max_uri_per_min = max((self._uri_per_min(e) for e in entries), default=0.0)
+        self._order = self._sorted_order()
+        self.endResetModel()
+
+    def clear(self):
+        self.set_results([])
+
+    def set_names(self, name_of):
+        """
+        New display names (name style switch): only the NPC column changes.
+        """
+        self._name_of = name_of
+        if self._order:
+            self.dataChanged.emit(
+                self.index(0, self.COL_NAME),
+                self.index(len(self._order) - 1, self.COL_NAME),
+                [Qt.DisplayRole],
+            )
+            if self._sort_column == self.COL_NAME:
+                self.sort(self._sort_column, self._sort_order)
+
+    def entry(self, row: int) -> dict:
+        return self._entries[self._order[row]]
+
+    @staticmethod
+    def _uri_per_min(entry: dict) -> float:
+        return float(entry.get("uri_per_hour", 0.0) or 0.0) / 60.0
+
+    def _display_name(self, entry: dict) -> str:
+        npc = entry["npc"]
+        return npc.name if self._name_of is None else self._name_of(npc)
+
+    # ------------------- Qt model API -------------------
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        col = index.column()
+
+        if role == Qt.TextAlignmentRole:
+            if col in self.NUMERIC_COLS:
+                return int(Qt.AlignRight | Qt.AlignVCenter)
+            return int(Qt.AlignLeft | Qt.AlignVCenter)
+        if role != Qt.DisplayRole:
+            return None
+
+        entry = self._entries[self._order[index.row()]]
+        if col == 0:
+            return self._display_name(entry)
+        if col == 1:
+            return str(entry["npc"].map)
+        if col == 2:
+            return f"{entry['hp']:,}"
+        if col == 3:
+            return f"{entry['uri']:,}"
+        if col == 4:
+            return f"{entry['ttk']:.2f}"
+        if col == 5:
+            return f"{self._uri_per_min(entry):.2f}"
+        if col == 6:
+            return _rating_for(self._uri_per_min(entry), self._max_uri_per_min)
+        return None
+
+    # ------------------- Sorting -------------------
+
+    def _sort_key(self, column: int):
+        entries = self._entries
+        if column == 0:
+            return lambda i: self._display_name(entries[i]).casefold()
+        if column == 1:
+            return lambda i: str(entries[i]["npc"].map)
+        if column == 2:
+            return lambda i: entries[i]["hp"]
+        if column == 3:
+            return lambda i: entries[i]["uri"]
+        if column == 4:
+            return lambda i: entries[i]["ttk"]
+        # Uri / min and Rating
+        return lambda i: self._uri_per_min(entries[i])
+
+    def _sorted_order(self) -> list:
+        order = list(range(len(self._entries)))
+        if 0 <= self._sort_column < len(self.HEADERS):
+            order.sort(key=self._sort_key(self._sort_column), reverse=self._sort_order == Qt.DescendingOrder)
+        return order
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self._sort_column = column
+        self._sort_order = order
+
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        old_entries = [self._order[i.row()] for i in old_indexes]
+        self._order = self._sorted_order()
+        row_of = {entry_index: row for row, entry_index in enumerate(self._order)}
+        self.changePersistentIndexList(
+            old_indexes,
+            [self.index(row_of[e], i.column()) for e, i in zip(old_entries, old_indexes)],
+        )
+        self.layoutChanged.emit()
 
 
 class FarmingPage(QWidget):
@@ -30,7 +199,10 @@ class FarmingPage(QWidget):
         self.name_style = name_style or "vanilla"
 
         # NPCs laden (kann leer sein, falls Datei fehlt)
-        self.npcs = models.load_npcs()
+        self.npc_repo = models.get_npc_repository()
+        self._rank_indexes = {}  # map filter -> BreakpointIndex
+        self._rank_lock = threading.Lock()  # _rank_indexes is filled by ranking jobs
+        self._recalc_key = get_scheduler().register(self.recalculate)
 
         self._init_ui()
         self._update_build_summary()
@@ -61,18 +233,24 @@ class FarmingPage(QWidget):
         self.cmb_map = QComboBox()
         self.cmb_map.addItem("All maps", "")
 
-        maps_seen = set()
-        for npc in self.npcs:
-            if npc.map and npc.map not in maps_seen:
-                maps_seen.add(npc.map)
-        for m in sorted(maps_seen):
+        for m in self.npc_repo.maps():
             self.cmb_map.addItem(m, m)
+        self.cmb_map.currentIndexChanged.connect(self._on_filter_changed)
+
+        self.lbl_top = QLabel("Show:")
+        self.cmb_top = QComboBox()
+        for top_n in TOP_N_CHOICES:
+            self.cmb_top.addItem("", top_n)
+        self.cmb_top.setCurrentIndex(TOP_N_CHOICES.index(DEFAULT_TOP_N))
+        self.cmb_top.currentIndexChanged.connect(self._on_filter_changed)
 
         self.btn_calc = QPushButton("Calculate suggestions")
         self.btn_calc.clicked.connect(self.recalculate)
 
         controls.addWidget(self.lbl_map)
         controls.addWidget(self.cmb_map)
+        controls.addWidget(self.lbl_top)
+        controls.addWidget(self.cmb_top)
         controls.addStretch()
         controls.addWidget(self.btn_calc)
 
@@ -83,18 +261,16 @@ class FarmingPage(QWidget):
         box_layout = QVBoxLayout(box)
         box_layout.setContentsMargins(8, 8, 8, 8)
 
-        self.table = QTableWidget(0, 7, self)
-        self.table.setHorizontalHeaderLabels(
-            [
-                "NPC",
-                "Map",
-                "HP + Shield",
-                "Uri / kill",
-                "TTK (s)",
-                "Uri / min",
-                "Rating",
-            ]
-        )
+        self.model = FarmingTableModel(self)
+        self.model.set_names(self._npc_names())
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # no sort column = ranking order; clicking a header sorts by it
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.DescendingOrder)
+        self.table.setSortingEnabled(True)
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.setAlternatingRowColors(True)
         self.table.setStyleSheet(
@@ -104,7 +280,7 @@ class FarmingPage(QWidget):
                 border-radius: 16px;
                 background-color: #05060c;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #05060c;
                 gridline-color: #222222;
                 color: #e0e0e0;
@@ -159,8 +335,7 @@ class FarmingPage(QWidget):
             self.build_label.setText("")
             return
     def _update_npc_status(self):
-        count = len(self.npcs) if isinstance(self.npcs, list) else 0
-        self.npc_status_label.setText(f"Loaded NPCs: {count}")
+        self.npc_status_label.setText(f"Loaded NPCs: {len(self.npc_repo)}")
 
         res = self.app_state.get("last_damage_result") or {}
         state = self.app_state.get("last_damage_state") or {}
@@ -199,21 +374,68 @@ class FarmingPage(QWidget):
 
         self.build_label.setText(txt)
 
-    def _rating_for(self, uri_per_min: float, max_uri_per_min: float) -> str:
-        if max_uri_per_min <= 0:
-            return "-"
-        ratio = uri_per_min / max_uri_per_min
-        if ratio >= 0.9:
-            return "A+"
-        if ratio >= 0.75:
-            return "A"
-        if ratio >= 0.6:
-            return "B"
-        if ratio >= 0.4:
-            return "C"
-        if ratio >= 0.2:
-            return "D"
-        return "F"
+    def _rank_index(self, repo, indexes: dict, map_filter, rows) -> BreakpointIndex:
+        # one per map filter, kept for the top-N views; runs on the ranking
+        # thread. repo / indexes are taken when the job is submitted, so a
+        # job that outlives a hot reload cannot cache an index of the old NPCs.
+        with self._rank_lock:
+            index = indexes.get(map_filter)
+            if index is None:
+                index = BreakpointIndex(repo.table, rows=rows, top_n=max(TOP_N_CHOICES))
+                indexes[map_filter] = index
+        return index
+
+    def _rank_job(self, dps: float, map_filter, top_n: int):
+        # func(token) for the scheduler; must not touch any widget.
+        # Top-N views are answered from the map's BreakpointIndex (a binary
+        # search while the DPS stays in a known interval); "all NPCs" and
+        # maps too large for an index are one direct scoring pass.
+        repo = self.npc_repo
+        indexes = self._rank_indexes
+
+        def job(token):
+            rows = repo.filter_rows(map_id=map_filter)
+            if token.is_cancelled():
+                return None
+            if not rows:
+                return {"no_npcs": True, "suggestions": []}
+            if top_n and len(rows) <= BreakpointIndex.MAX_ROWS:
+                suggestions = self._rank_index(repo, indexes, map_filter, rows).lookup(dps, top_n)
+            else:
+                # the view only formats visible rows
+                suggestions = models.suggest_best_npcs(dps, repo.table, top_n=top_n, rows=rows)
+            if token.is_cancelled():
+                return None
+            return {"no_npcs": False, "suggestions": suggestions}
+
+        return job
+
+    def _sync_map_combo(self):
+        # keep the combo in step with the maps of the NPC repository,
+        # without touching entries that did not change
+        maps = self.npc_repo.maps()
+        wanted = set(maps)
+        current = self.cmb_map.currentData()
+
+        self.cmb_map.blockSignals(True)
+        for i in range(self.cmb_map.count() - 1, 0, -1):  # 0 = "All maps"
+            if self.cmb_map.itemData(i) not in wanted:
+                self.cmb_map.removeItem(i)
+        for pos, m in enumerate(maps, start=1):
+            if self.cmb_map.itemData(pos) != m:
+                self.cmb_map.insertItem(pos, m, m)
+        self.cmb_map.setCurrentIndex(max(self.cmb_map.findData(current), 0))
+        self.cmb_map.blockSignals(False)
+
+    def _npc_names(self):
+        # display name per NPC row for the current name style
+        return functools.partial(get_name_index().npc_display_name, style=self.name_style, lang=self.language)
+
+    def _on_filter_changed(self, _idx: int):
+        # only re-rank automatically once suggestions are shown (or on the way)
+        scheduler = get_scheduler()
+        if self.model.rowCount() > 0 or scheduler.is_running(self._recalc_key):
+            scheduler.request(self._recalc_key)
 
     # ------------------- Public API -------------------
 
@@ -232,68 +454,47 @@ class FarmingPage(QWidget):
                     "No valid setup found. Please calculate damage first and click "
                     "'Use in Farming Guide' in the Damage Calculator."
                 )
-            self.table.setRowCount(0)
+            get_scheduler().cancel(self._recalc_key)
+            self.model.clear()
             return
 
-        # NPC-Filter
+        # Ranking runs on the thread pool; a newer recalculate() (other DPS
+        # or map) cancels it and only the newest result reaches the table.
         map_filter = self.cmb_map.currentData()
-        filtered_npcs = self.npcs
-        if map_filter:
-            filtered_npcs = [n for n in filtered_npcs if n.map == map_filter]
+        top_n = self.cmb_top.currentData()
+        if self.language == "de":
+            self.info_label.setText("Berechne Vorschläge ...")
+        else:
+            self.info_label.setText("Calculating suggestions ...")
+        get_scheduler().run_in_background(
+            self._recalc_key,
+            self._rank_job(dps, map_filter, top_n),
+            self._on_ranking_done,
+            self._on_ranking_failed,
+        )
+
+    def _on_ranking_done(self, result):
+        if result is None:
+            return  # cancelled; the newer job delivers
 
-        if not filtered_npcs:
-            self.table.setRowCount(0)
+        if result["no_npcs"]:
+            self.model.clear()
             if self.language == "de":
                 self.info_label.setText("Keine NPCs für diesen Filter gefunden.")
             else:
                 self.info_label.setText("No NPCs found for this filter.")
             return
 
-        suggestions = models.suggest_best_npcs(dps, filtered_npcs, top_n=50)
-
+        suggestions = result["suggestions"]
         if not suggestions:
-            self.table.setRowCount(0)
+            self.model.clear()
             if self.language == "de":
                 self.info_label.setText("Mit diesem DPS kann keine sinnvolle Auswertung berechnet werden.")
             else:
                 self.info_label.setText("No meaningful ranking could be calculated with this DPS.")
             return
 
-        max_uri_per_min = max(
-            (float(s.get("uri_per_hour", 0.0) or 0.0) / 60.0) for s in suggestions
-        ) if suggestions else 0.0
-
-
-        self.table.setRowCount(len(suggestions))
-        use_mod = self.name_style == "mod"
-
-        for row, entry in enumerate(suggestions):
-            npc = entry["npc"]
-            hp = entry["hp"]
-            uri = entry["uri"]
-            ttk = entry["ttk"]
-            uri_per_hour = float(entry.get("uri_per_hour", 0.0) or 0.0)
-            uri_per_min = uri_per_hour / 60.0
-
-            display_name = models.get_display_npc_name(npc, "mod" if use_mod else "vanilla")
-            rating = self._rating_for(uri_per_min, max_uri_per_min)
-
-            values = [
-                display_name,
-                npc.map,
-                f"{hp:,}",
-                f"{uri:,}",
-                f"{ttk:.2f}",
-                f"{uri_per_min:.2f}",
-                rating,
-            ]
-            for col, val in enumerate(values):
-                item = QTableWidgetItem(str(val))
-                if col in (2, 3, 4, 5):
-                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                else:
-                    item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                self.table.setItem(row, col, item)
+        self.model.set_results(suggestions)
 
         if self.language == "de":
             self.info_label.setText(
@@ -306,20 +507,55 @@ class FarmingPage(QWidget):
                 "Use this as a guideline, not an absolute truth."
             )
 
+    def apply_npc_changes(self, repo, diff: dict):
+        """
+        Hot reload of npcs.json: switch to `repo` and only re-rank if the
+        changed NPCs (diff from models.diff_npc_tables) touch the shown map.
+        """
+        touched = diff["maps"]
+        self.npc_repo = repo
+        # row numbers of unchanged maps can move too; indexes are cheap to rebuild
+        with self._rank_lock:
+            self._rank_indexes = {}
+
+        old_filter = self.cmb_map.currentData()
+        self._sync_map_combo()
+        self.model.set_names(self._npc_names())
+        self._update_npc_status()
+
+        scheduler = get_scheduler()
+        shown = self.model.rowCount() > 0 or scheduler.is_running(self._recalc_key)
+        if shown and (not old_filter or old_filter in touched or self.cmb_map.currentData() != old_filter):
+            scheduler.request(self._recalc_key)
+
+    def _on_ranking_failed(self, error):
+        log.error("ranking failed: %r", error)
+        self.model.clear()
+        if self.language == "de":
+            self.info_label.setText("Die Vorschläge konnten nicht berechnet werden.")
+        else:
+            self.info_label.setText("Could not calculate suggestions.")
+
     def set_language(self, lang: str):
         self.language = lang
         if lang == "de":
             self.heading.setText("NPC-Farming-Guide")
             self.lbl_map.setText("Karte:")
+            self.lbl_top.setText("Anzeigen:")
             self.btn_calc.setText("Vorschläge berechnen")
         else:
             self.heading.setText("NPC Farming Guide")
             self.lbl_map.setText("Map:")
+            self.lbl_top.setText("Show:")
             self.btn_calc.setText("Calculate suggestions")
+        for i, top_n in enumerate(TOP_N_CHOICES):
+            if top_n:
+                self.cmb_top.setItemText(i, f"Top {top_n}")
+            else:
+                self.cmb_top.setItemText(i, "Alle NPCs" if lang == "de" else "All NPCs")
 
     def set_name_style(self, style: str):
         if style in ("vanilla", "mod"):
             self.name_style = style
-            # Tabelle neu zeichnen, falls bereits Daten vorhanden
-            if self.table.rowCount() > 0:
-                self.recalculate()
+            # nur die Namensspalte tauschen, Ranking bleibt gleich
+            self.model.set_names(self._npc_names())
@@ -0,0 +1,135 @@
+"""
+Incremental reader for large JSON array files (npcs.json, community data
+sets, ...).
+
+iter_json_array() yields the items of a top-level JSON array one at a
+time while the file is read in chunks, so a caller that turns every item
+into its own compact form (e.g. an NPCTable row) never holds the whole
+text or the whole list of dicts:
+
+    from .jsonstream import iter_json_file
+
+    for entry in iter_json_file(path):
+        table.append(...)
+
+Each item is decoded with json.JSONDecoder.raw_decode(), so values are
+exactly what json.loads() would produce. Malformed input raises
+json.JSONDecodeError (a ValueError) when it is reached; items before that
+point have already been yielded.
+"""
+
+import codecs
+import json
+import re
+
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# what may follow an array item
+_SEPARATOR = re.compile(r"[ \t\n\r]*([,\]])[ \t\n\r]*")
+
+
+def iter_text_chunks(f, chunk_size: int = CHUNK_SIZE, digest=None):
+    """
+    UTF-8 text chunks of the binary file `f`. `digest` (a hashlib object)
+    is fed the raw bytes on the way.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while True:
+        data = f.read(chunk_size)
+        if digest is not None and data:
+            digest.update(data)
+        text = decoder.decode(data, final=not data)
+        if text:
+            yield text
+        if not data:
+            return
+
+
+def iter_json_array(chunks):
+    """
+    Items of the JSON array in the text `chunks` (any iterable of str).
+    """
+    decoder = json.JSONDecoder()
+    scan = decoder.scan_once
+    chunks = iter(chunks)
+    buf = ""
+    pos = 0
+    eof = False
+
+    def more(at_least: int = 1) -> bool:
+        # append the next chunk(s), dropping the consumed text; retries ask
+        # for as much again as is buffered, so a long item is re-scanned
+        # O(log n) times, not once per chunk
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        parts = [buf[pos:]]
+        got = 0
+        for chunk in chunks:
+            parts.append(chunk)
+            got += len(chunk)
+            if got >= at_least:
+                break
+        else:
+            eof = True
+        if not got:
+            return False
+        buf = "".join(parts)
+        pos = 0
+        return True
+
+    def skip_ws() -> bool:
+        # move pos to the next non-whitespace char; False at the end of input
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or not more():
+                return pos < len(buf)
+
+    if not skip_ws() or buf[pos] != "[":
+        raise json.JSONDecodeError("top-level value is not an array", buf, pos)
+    pos += 1
+    if not skip_ws():
+        raise json.JSONDecodeError("unterminated array", buf, pos)
+
+    if buf[pos] == "]":
+        pos += 1
+    else:
+        while True:
+            # fast path: the item and the "," / "]" after it are buffered
+            # (a separator also proves that a number did not go on)
+            try:
+                item, end = scan(buf, pos)
+            except (StopIteration, json.JSONDecodeError):
+                sep = None
+            else:
+                sep = _SEPARATOR.match(buf, end)
+            if sep is None:
+                # item or separator cut off by the chunk end -> read on
+                if more(len(buf) - pos):
+                    # the separator match stopped at the old chunk end
+                    pos = _WHITESPACE.match(buf, pos).end()
+                    continue
+                # end of input: raise the matching error
+                item, end = decoder.raw_decode(buf, pos)
+                if _WHITESPACE.match(buf, end).end() < len(buf):
+                    raise json.JSONDecodeError("expected ',' or ']'", buf, _WHITESPACE.match(buf, end).end())
+                raise json.JSONDecodeError("unterminated array", buf, len(buf))
+
+            yield item
+            pos = sep.end()
+            if sep.group(1) == "]":
+                break
+
+    if skip_ws():
+        raise json.JSONDecodeError("extra data", buf, pos)
+
+
+def iter_json_file(path: str, chunk_size: int = CHUNK_SIZE, digest=None):
+    """
+    Items of the JSON array in the file `path`, read in chunks.
+    """
+    with open(path, "rb") as f:
+        yield from iter_json_array(iter_text_chunks(f, chunk_size, digest))
@@ -0,0 +1,122 @@
+"""
+Logging for Space Aces Companion.
+
+All modules log through loggers below "sac" (get_logger("npcs") ->
+"sac.npcs") with %-style arguments, so a record that is filtered out by
+the level is never formatted:
+
+    from .logs import get_logger, counters
+
+    log = get_logger("npcs")
+    log.debug("skipping entry %r: %s", entry, e)   # free unless DEBUG is on
+    counters.add("npcs.skipped")
+
+Records are kept in a ring buffer (the last RING_SIZE records, formatted
+only when someone looks at them; Settings -> Diagnostics). Console output
+is only set up by setup_logging(): the windowed EXE has no console, so
+there nothing is written at all.
+
+Counters are cheap named numbers (entries parsed / skipped, load time, ...)
+shown next to the log.
+"""
+
+import collections
+import logging
+import sys
+import threading
+
+
+ROOT = "sac"
+RING_SIZE = 500
+DEFAULT_LEVEL = logging.INFO
+
+FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+DATE_FORMAT = "%H:%M:%S"
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keeps the last `capacity` records as they are; formatting happens in
+    lines(), i.e. only for records that are actually viewed.
+    """
+
+    def __init__(self, capacity: int = RING_SIZE):
+        super().__init__()
+        self._records = collections.deque(maxlen=capacity)
+        self.setFormatter(logging.Formatter(FORMAT, DATE_FORMAT))
+
+    def emit(self, record):
+        self._records.append(record)
+
+    def records(self) -> list:
+        with self.lock:
+            return list(self._records)
+
+    def lines(self, level: int = logging.NOTSET) -> list:
+        return [self.format(r) for r in self.records() if r.levelno >= level]
+
+    def clear(self):
+        with self.lock:
+            self._records.clear()
+
+
+class Counters:
+    """
+    Thread-safe named counters / gauges ("npcs.parsed", "npcs.load_ms").
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, value=1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + value
+
+    def set(self, name: str, value):
+        with self._lock:
+            self._values[name] = value
+
+    def get(self, name: str, default=0):
+        return self._values.get(name, default)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(sorted(self._values.items()))
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+ring_buffer = RingBufferHandler()
+counters = Counters()
+
+_root = logging.getLogger(ROOT)
+_root.setLevel(DEFAULT_LEVEL)
+_root.addHandler(ring_buffer)
+_console = None
+
+
+def setup_logging(level=DEFAULT_LEVEL, console: bool = True):
+    """
+    Set the level of all "sac" loggers and (if there is a console) also log
+    to stderr. Called once from main().
+    """
+    global _console
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = DEFAULT_LEVEL
+    _root.setLevel(level)
+
+    # windowed EXE: sys.stderr is None
+    if console and sys.stderr is not None and _console is None:
+        _console = logging.StreamHandler(sys.stderr)
+        _console.setFormatter(logging.Formatter(FORMAT, DATE_FORMAT))
+        _root.addHandler(_console)
+        _root.propagate = False
@@ -0,0 +1,167 @@
+"""
+Vanilla <-> MOD name aliases for NPCs, lasers, ammo, rockets, launchers and
+launcher rockets.
+
+NPC aliases come from models.NPC_MOD_NAME_MAP, item aliases from the
+"name" / "name_mod" (and optional "name_de") fields of the data pack.
+Everything is resolved once per kind: alias lookups in both directions are
+dict lookups, and the display names per name style and language are
+ready-made {id: name} dicts, so a name style switch only swaps dicts.
+NPC ids can repeat in npcs.json, so NPCs are keyed by their NPCTable row
+instead; the NPC part is built on first use, the item pages never load
+npcs.json for it.
+
+    from .names import get_name_index
+
+    names = get_name_index()
+    names.to_mod("laser", "LW-3")                 # -> "LF-3"
+    names.to_vanilla("npc", "Lordakia")           # -> "Luminid"
+    names.resolve("laser", "prometheus")          # -> "PRL"
+    names.display_names("npc", "mod", "de")       # -> {row: name}
+    names.display_names("laser", "mod")           # -> {laser id: name}
+"""
+
+import threading
+
+from . import models
+from .datapack import get_data_pack
+
+
+# alias kind -> data pack section
+ITEM_SECTIONS = {
+    "laser": "lasers",
+    "ammo": "ammo",
+    "rocket": "rockets",
+    "launcher": "rocket_launchers",
+    "rl_rocket": "rl_rockets",
+}
+
+NAME_STYLES = ("vanilla", "mod")
+LANGUAGES = ("en", "de")
+
+
+class NameIndex:
+    def __init__(self, npc_table=None, pack=None):
+        pack = pack or get_data_pack()
+        self._npc_table = npc_table  # None = current repository, on first use
+        self._npc_lock = threading.Lock()
+
+        self._to_mod = {}      # kind -> {vanilla name: mod name}
+        self._to_vanilla = {}  # kind -> {mod name: vanilla name}
+        self._ids = {}         # kind -> {casefolded alias: id (NPCs: row)}
+        self._display = {}     # (kind, style, lang) -> {id (NPCs: row): name}
+
+        for kind, section in ITEM_SECTIONS.items():
+            rows = []
+            for item_id, data in pack.section(section).items():
+                vanilla = data.get("name") or data.get("name_en") or item_id
+                rows.append((item_id, vanilla, data.get("name_mod") or vanilla, data.get("name_de")))
+            self._add_kind(kind, rows)
+
+    def _kind(self, kind: str) -> str:
+        if kind == "npc" and "npc" not in self._to_mod:
+            with self._npc_lock:
+                if "npc" not in self._to_mod:
+                    self._add_npcs()
+        return kind
+
+    def _add_npcs(self):
+        if self._npc_table is None:
+            self._npc_table = models.get_npc_repository().table
+        # names per row, MOD names from NPC_MOD_NAME_MAP
+        rows = []
+        for row, name in enumerate(self._npc_table.names):
+            rows.append((row, name, models.NPC_MOD_NAME_MAP.get(name, name), None))
+        self._add_kind("npc", rows)
+
+    def _add_kind(self, kind: str, rows: list):
+        to_mod = {}
+        to_vanilla = {}
+        ids = {}
+        vanilla_names = {}
+        mod_names = {}
+        de_names = {}
+
+        for item_id, vanilla, mod, name_de in rows:
+            to_mod.setdefault(vanilla, mod)
+            to_vanilla.setdefault(mod, vanilla)
+            for alias in (item_id, vanilla, mod, name_de):
+                if alias:
+                    ids.setdefault(str(alias).casefold(), item_id)
+            vanilla_names[item_id] = vanilla
+            mod_names[item_id] = mod
+            if name_de:
+                de_names[item_id] = name_de
+
+        for style, names in (("vanilla", vanilla_names), ("mod", mod_names)):
+            self._display[(kind, style, "en")] = names
+            # German only differs where the pack has name_de
+            self._display[(kind, style, "de")] = {**names, **de_names} if de_names else names
+        self._ids[kind] = ids
+        self._to_vanilla[kind] = to_vanilla
+        self._to_mod[kind] = to_mod  # last: marks the kind as complete
+
+    def kinds(self) -> list:
+        return ["npc", *ITEM_SECTIONS]
+
+    def to_mod(self, kind: str, vanilla_name: str) -> str:
+        return self._to_mod[self._kind(kind)].get(vanilla_name, vanilla_name)
+
+    def to_vanilla(self, kind: str, mod_name: str) -> str:
+        return self._to_vanilla[self._kind(kind)].get(mod_name, mod_name)
+
+    def resolve(self, kind: str, name: str):
+        """
+        Id (NPCs: first table row) for any alias (id, vanilla, MOD or German
+        name; case-insensitive), None if unknown.
+        """
+        return self._ids[self._kind(kind)].get(str(name).casefold())
+
+    def display_names(self, kind: str, style: str = "vanilla", lang: str = "en") -> dict:
+        """
+        {id: display name} for one name style / language. Shared, do not
+        modify.
+        """
+        if style not in NAME_STYLES:
+            style = "vanilla"
+        if lang not in LANGUAGES:
+            lang = "en"
+        return self._display[(self._kind(kind), style, lang)]
+
+    def display_name(self, kind: str, item_id, style: str = "vanilla", lang: str = "en") -> str:
+        return self.display_names(kind, style, lang).get(item_id, item_id)
+
+    def npc_display_name(self, npc, style: str = "vanilla", lang: str = "en") -> str:
+        """
+        Display name of an NPCRow. Rows of another NPCTable (results ranked
+        before a hot reload) are named from their own name.
+        """
+        names = self.display_names("npc", style, lang)
+        if getattr(npc, "table", None) is self._npc_table:
+            return names[npc.index]
+        return self.to_mod("npc", npc.name) if style == "mod" else npc.name
+
+
+_name_index = None
+_name_index_lock = threading.Lock()
+
+
+def get_name_index(reload: bool = False) -> NameIndex:
+    """
+    Process-wide NameIndex over the current NPC repository and data pack.
+    """
+    global _name_index
+    with _name_index_lock:
+        if _name_index is None or reload:
+            _name_index = NameIndex()
+        return _name_index
+
+
+def reset_name_index():
+    """
+    Drop the index (NPCs or pack changed); the next get_name_index()
+    rebuilds it.
+    """
+    global _name_index
+    with _name_index_lock:
+        _name_index = None
@@ -0,0 +1,366 @@
+"""
+Loadout optimizer for the Space Aces Damage Calculator.
+
+Finds the best laser split (ship / drones), ammo, formation and drone
+designs for a given inventory, either for maximum DPS or for maximum
+uri/hour against the NPCs from npcs.json.
+
+Usage:
+
+    from sac_pages import optimizer
+
+    best = optimizer.optimize_loadout({
+        "lasers": {"LW3": {"count": 20, "upgrade": 16}, "LW4": {"count": 5, "upgrade": 10}},
+        "ship_slots": 15,
+        "drones": {"IRIS": {"count": 8, "level": 16}, "APIS": {"count": 1, "level": 12}},
+    })
+    best["state"]   # DamagePage-style state
+    best["result"]  # models.calculate_damage_overview(best["state"])
+
+The search does not walk every combination. Formation, Vandal and Saturn
+Conqueror only scale the laser DPS, so the laser split depends on nothing but
+the ammo multiplier, the drone bonus and the drone slots; it is solved once
+per distinct drone setup (exactly, see _SplitSearch) and reused for every
+formation. Ammo is a plain multiplier, so the strongest allowed ammo always
+wins. uri/hour grows with DPS for every NPC, so the uri objective is a DPS
+search per target class (pirate / Saturn) followed by an NPC pick.
+"""
+
+import copy
+import itertools
+
+from . import models
+
+
+# DamagePage defaults without the parts the optimizer searches
+DEFAULT_BASE_STATE = dict(
+    models.default_damage_state(),
+    laser_groups=[],
+    drones={},
+    lasers_on_drones_by_type={},
+)
+
+
+# ------------------------------------------------------------------
+# Inventory helpers
+# ------------------------------------------------------------------
+
+def _normalize_inventory(inventory: dict) -> dict:
+    lasers = {}
+    for laser_type, value in (inventory.get("lasers") or {}).items():
+        if laser_type not in models.LASERS:
+            raise ValueError(f"unknown laser type: {laser_type!r}")
+        if isinstance(value, dict):
+            count = int(value.get("count", 0))
+            upgrade = int(value.get("upgrade", 16))
+        else:
+            count, upgrade = int(value), 16
+        if count > 0:
+            lasers[laser_type] = {"count": count, "upgrade": min(max(upgrade, 0), 16)}
+
+    drones = {}
+    for drone_id, value in (inventory.get("drones") or {}).items():
+        drone_def = models.DRONES.get(drone_id)
+        if not drone_def:
+            raise ValueError(f"unknown drone: {drone_id!r}")
+        if isinstance(value, dict):
+            count = int(value.get("count", 0))
+            level = int(value.get("level", 16))
+        else:
+            count, level = int(value), 16
+        count = min(count, drone_def["max_count"])
+        if count > 0:
+            drones[drone_id] = {"count": count, "level": min(max(level, 1), 16)}
+
+    total_lasers = sum(l["count"] for l in lasers.values())
+    ship_slots = inventory.get("ship_slots")
+    ship_slots = total_lasers if ship_slots is None else max(0, int(ship_slots))
+
+    def _allowed(key, table):
+        ids = inventory.get(key)
+        if ids is None:
+            return list(table)
+        unknown = [i for i in ids if i not in table]
+        if unknown:
+            raise ValueError(f"unknown {key}: {unknown!r}")
+        return list(ids)
+
+    return {
+        "lasers": lasers,
+        "drones": drones,
+        "ship_slots": ship_slots,
+        "formations": _allowed("formations", models.FORMATIONS),
+        "designs": _allowed("designs", models.DRONE_DESIGNS),
+        "ammo": _allowed("ammo", models.AMMO),
+    }
+
+
+def _best_ammo(ammo_ids: list, is_pirate: bool) -> str:
+    key = "mult_pirate" if is_pirate else "mult_normal"
+    return max(ammo_ids, key=lambda a: models.AMMO[a][key])
+
+
+def _build_state(base_state: dict, inv: dict, split: dict, designs: dict,
+                 formation: str, ammo: str, is_pirate: bool, is_saturn: bool) -> dict:
+    state = copy.deepcopy(base_state)
+    state["ammo"] = ammo
+    state["formation"] = formation
+    state["target_is_pirate"] = is_pirate
+    state.setdefault("rocket_launcher", {})["target_is_saturn"] = is_saturn
+
+    state["laser_groups"] = [
+        {"type": t, "count": s, "upgrade": inv["lasers"][t]["upgrade"]}
+        for t, (s, _d) in split.items()
+        if s > 0
+    ]
+    state["lasers_on_drones_by_type"] = {t: split.get(t, (0, 0))[1] for t in models.LASERS}
+
+    state["drones"] = {}
+    for drone_id, drone_def in models.DRONES.items():
+        d = inv["drones"].get(drone_id)
+        state["drones"][drone_id] = {
+            "count": d["count"] if d else 0,
+            "level": d["level"] if d else 16,
+            "design": designs.get(drone_id, "NONE"),
+            "lasers_per_drone": drone_def["max_lasers"],
+        }
+    return state
+
+
+# ------------------------------------------------------------------
+# Laser split
+# ------------------------------------------------------------------
+
+def _prefix_sums(values: list) -> list:
+    sums = [0.0]
+    for v in values:
+        sums.append(sums[-1] + v)
+    return sums
+
+
+class _SplitSearch:
+    """
+    Maximizes  raw * (1 + D / T * avg_bonus)  over the ship / drone split,
+    with T lasers in total, D of them on drones (D <= drone slots).
+
+    Drone lasers are rated the way the damage model rates them: at the ship
+    upgrade level of that laser type, or level 16 if none of that type is
+    on the ship.
+
+    For fixed totals S (ship) and D (drones) the multiplier is fixed, so
+    only raw has to be maximized. The types only interact through "is any
+    of it on the ship", so every set of drone-only types is tried (2^types):
+    their lasers count at level 16 and only fit on drones, all others count
+    at their ship rating on either side. The best raw for (S, D) then takes
+    the k strongest drone-only lasers and the T - k strongest others; both
+    prefix sums are concave in k, so the best k is where the merged
+    strongest-first list puts it, clamped to what S and D allow.
+    """
+
+    def __init__(self, inv: dict, ammo_mult: float, avg_bonus: float, drone_slots: int):
+        self.avg_bonus = avg_bonus
+        self.ship_slots = inv["ship_slots"]
+        self.drone_slots = drone_slots
+        self.types = []
+        for laser_type, entry in inv["lasers"].items():
+            laser_def = models.LASERS[laser_type]
+            r_ship = models._laser_group_dps(laser_def, entry["upgrade"], ammo_mult, 1)
+            r_lvl16 = models._laser_group_dps(laser_def, 16, ammo_mult, 1)
+            self.types.append((laser_type, entry["count"], r_ship, r_lvl16))
+        # strongest first: ties go to the stronger type
+        self.types.sort(key=lambda t: max(t[2], t[3]), reverse=True)
+
+        self.best_value = -1.0
+        self.best_split = {}
+        self.nodes = 0   # (drone-only set, S, D) combinations rated
+        self.pruned = 0  # drone-only sets skipped (no drone slots)
+
+    def _value(self, raw: float, on_drones: int, total: int) -> float:
+        if total <= 0:
+            return 0.0
+        return raw * (1.0 + on_drones / total * self.avg_bonus)
+
+    def run(self) -> tuple[dict, float]:
+        best = None  # (value, drone_only, ship, drones, k)
+        for mask in range(1 << len(self.types)):
+            drone_only = [t for i, t in enumerate(self.types) if mask >> i & 1]
+            if drone_only and self.drone_slots <= 0:
+                self.pruned += 1
+                continue
+            flex = [t for i, t in enumerate(self.types) if not mask >> i & 1]
+            drone_values = sorted((r16 for _t, n, _r, r16 in drone_only for _ in range(n)), reverse=True)
+            flex_values = sorted((r for _t, n, r, _r16 in flex for _ in range(n)), reverse=True)
+            drone_sums = _prefix_sums(drone_values)
+            flex_sums = _prefix_sums(flex_values)
+
+            # drone-only lasers among the T strongest of both lists
+            k_free = [0]
+            i = j = 0
+            while i < len(drone_values) or j < len(flex_values):
+                if j == len(flex_values) or (i < len(drone_values) and drone_values[i] > flex_values[j]):
+                    i += 1
+                else:
+                    j += 1
+                k_free.append(i)
+
+            for ship in range(min(self.ship_slots, len(flex_values)) + 1):
+                max_drones = min(self.drone_slots, len(flex_values) - ship + len(drone_values))
+                for drones in range(max_drones + 1):
+                    total = ship + drones
+                    self.nodes += 1
+                    # k drone-only lasers: at most `drones`, and the others
+                    # must cover the ship plus the rest of the drones
+                    k_lo = max(0, total - len(flex_values))
+                    k_hi = min(drones, len(drone_values))
+                    k = min(max(k_free[total], k_lo), k_hi)
+                    raw = drone_sums[k] + flex_sums[total - k]
+                    value = self._value(raw, drones, total)
+                    if best is None or value > best[0]:
+                        best = (value, drone_only, flex, ship, drones, k)
+
+        if best is not None:
+            self.best_split = self._split_for(*best[1:])
+            self.best_value = self._rate(self.best_split)
+        return self.best_split, self.best_value
+
+    def _split_for(self, drone_only: list, flex: list, ship: int, drones: int, k: int) -> dict:
+        counts = {t[0]: [0, 0] for t in self.types}  # type -> [ship, drones]
+        left = k
+        for laser_type, n, _r, _r16 in sorted(drone_only, key=lambda t: t[3], reverse=True):
+            take = min(n, left)
+            counts[laser_type][1] = take
+            left -= take
+
+        # the strongest others; one ship slot per used type first, so
+        # their drone lasers keep the ship rating the bound assumed
+        picked = []
+        left = ship + drones - k
+        for laser_type, n, _r, _r16 in sorted(flex, key=lambda t: t[2], reverse=True):
+            take = min(n, left)
+            if take:
+                picked.append([laser_type, take])
+            left -= take
+        ship_left = ship
+        for entry in picked:
+            if ship_left:
+                counts[entry[0]][0] += 1
+                entry[1] -= 1
+                ship_left -= 1
+        for entry in picked:
+            take = min(entry[1], ship_left)
+            counts[entry[0]][0] += take
+            counts[entry[0]][1] += entry[1] - take
+            ship_left -= take
+        return {t: (s, d) for t, (s, d) in counts.items()}
+
+    def _rate(self, split: dict) -> float:
+        raw = 0.0
+        on_drones = total = 0
+        for laser_type, _n, r_ship, r_lvl16 in self.types:
+            s, d = split.get(laser_type, (0, 0))
+            raw += s * r_ship + d * (r_ship if s > 0 else r_lvl16)
+            on_drones += d
+            total += s + d
+        return self._value(raw, on_drones, total)
+
+
+# ------------------------------------------------------------------
+# Public API
+# ------------------------------------------------------------------
+
+def _optimize_for_target(inv: dict, base_state: dict, is_pirate: bool, is_saturn: bool, stats: dict) -> dict:
+    ammo = _best_ammo(inv["ammo"], is_pirate)
+    ammo_mult = models.AMMO[ammo]["mult_pirate" if is_pirate else "mult_normal"]
+
+    drone_ids = list(inv["drones"])
+    split_cache = {}
+    best = None
+
+    for design_combo in itertools.product(inv["designs"], repeat=len(drone_ids)):
+        designs = dict(zip(drone_ids, design_combo))
+
+        # drone bonus and slots do not depend on lasers or formation
+        probe = models.compile_state(_build_state(base_state, inv, {}, designs, "NONE", ammo, is_pirate, is_saturn))
+        split_key = (probe.avg_bonus_per_drone, probe.drone_slots)
+        if split_key not in split_cache:
+            search = _SplitSearch(inv, ammo_mult, probe.avg_bonus_per_drone, probe.drone_slots)
+            split_cache[split_key] = search.run()[0]
+            stats["nodes"] += search.nodes
+            stats["pruned"] += search.pruned
+        split = split_cache[split_key]
+
+        for formation in inv["formations"]:
+            state = _build_state(base_state, inv, split, designs, formation, ammo, is_pirate, is_saturn)
+            plan = models.compile_state(state)
+            stats["evaluated"] += 1
+            if best is None or plan.total_dps > best[0].total_dps:
+                best = (plan, state)
+
+    plan, state = best
+    result = models.calculate_damage_overview(state)
+    if result["total_dps"] != plan.total_dps:
+        raise RuntimeError("optimizer result does not match calculate_damage_overview()")
+    return {"state": state, "result": result}
+
+
+def _npc_flags(npc) -> tuple[bool, bool]:
+    is_pirate = bool(getattr(npc, "is_pirate", False))
+    is_saturn = str(getattr(npc, "faction", "") or "").lower() == "saturn"
+    return is_pirate, is_saturn
+
+
+def optimize_loadout(inventory: dict, base_state: dict | None = None, objective: str = "dps",
+                     npcs: list | None = None, search_time: float = 5.0) -> dict:
+    """
+    Find the best loadout for `inventory`.
+
+    inventory:
+        "lasers":     {laser_id: {"count": n, "upgrade": 0..16}} (or just n, upgrade 16)
+        "drones":     {drone_id: {"count": n, "level": 1..16}}   (or just n, level 16)
+        "ship_slots": max. lasers on the ship (default: all lasers)
+        "formations", "designs", "ammo": allowed ids (default: all)
+
+    `base_state` supplies everything that is not searched (skills, rockets,
+    rocket launcher, npc_hp). objective is "dps" or "uri_per_hour"; the
+    latter ranks against `npcs` (default: models.load_npcs()).
+
+    Returns {"state", "result", "objective", "value", "npc", "stats"}, where
+    "result" is models.calculate_damage_overview(state).
+    """
+    if objective not in ("dps", "uri_per_hour"):
+        raise ValueError(f"unknown objective: {objective!r}")
+
+    inv = _normalize_inventory(inventory)
+    base = copy.deepcopy(DEFAULT_BASE_STATE)
+    if base_state:
+        base.update(copy.deepcopy(base_state))
+
+    stats = {"evaluated": 0, "nodes": 0, "pruned": 0}
+
+    if objective == "dps":
+        is_pirate = bool(base.get("target_is_pirate"))
+        is_saturn = bool(base.get("rocket_launcher", {}).get("target_is_saturn", False))
+        best = _optimize_for_target(inv, base, is_pirate, is_saturn, stats)
+        best.update(objective=objective, value=best["result"]["total_dps"], npc=None, stats=stats)
+        return best
+
+    if npcs is None:
+        npcs = models.load_npcs()
+    groups = {}
+    for npc in npcs:
+        groups.setdefault(_npc_flags(npc), []).append(npc)
+
+    best = None
+    for (is_pirate, is_saturn), group in groups.items():
+        candidate = _optimize_for_target(inv, base, is_pirate, is_saturn, stats)
+        ranking = models.suggest_best_npcs(candidate["result"]["total_dps"], group, search_time=search_time, top_n=0)
+        if not ranking:
+            continue
+        top = max(ranking, key=lambda r: r["uri_per_hour"])
+        if best is None or top["uri_per_hour"] > best["value"]:
+            best = dict(candidate, value=top["uri_per_hour"], npc=top["npc"])
+
+    if best is None:
+        return {"state": None, "result": None, "objective": objective, "value": 0.0, "npc": None, "stats": stats}
+    best.update(objective=objective, stats=stats)
+    return best
@@ -0,0 +1,131 @@
+"""
+Startup profiling for Space Aces Companion.
+
+Enabled with `python main.py --profile-startup` (or
+`SpaceAcesCompanion.exe --profile-startup=report.json`). Records wall time
+for the startup phases and writes a report when the window has painted
+for the first time.
+
+Report formats (picked by file extension):
+
+- *.json    Chrome trace events: open in chrome://tracing, ui.perfetto.dev
+            or speedscope.app for a flame chart. A "summary" key lists the
+            total ms per span.
+- *.folded  collapsed stacks ("a;b;c <self µs>") for flamegraph.pl /
+            inferno.
+
+Code that wants to show up in the report wraps itself in span():
+
+    from . import profiling
+
+    with profiling.span("load_npcs"):
+        ...
+
+When profiling is off, span() records nothing.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.spans = []  # (stack tuple, start, end, thread id)
+        self._local = threading.local()
+
+    def enable(self, origin: float | None = None):
+        self.enabled = True
+        if origin is not None:
+            self.origin = origin
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def add_span(self, name: str, start: float, end: float):
+        """
+        Record a span measured elsewhere (e.g. imports before profiling was
+        switched on). It is placed under the currently open span.
+        """
+        if not self.enabled:
+            return
+        stack = tuple(self._stack()) + (name,)
+        self.spans.append((stack, start, end, threading.get_ident()))
+
+    @contextlib.contextmanager
+    def span(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        stack = self._stack()
+        stack.append(name)
+        path = tuple(stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            self.spans.append((path, start, end, threading.get_ident()))
+
+    # ------------------- Reports -------------------
+
+    def summary(self) -> dict:
+        totals = {}
+        for path, start, end, _tid in self.spans:
+            name = path[-1]
+            totals[name] = totals.get(name, 0.0) + (end - start) * 1000.0
+        return {name: round(ms, 3) for name, ms in totals.items()}
+
+    def trace_events(self) -> list:
+        pid = os.getpid()
+        events = []
+        for path, start, end, tid in sorted(self.spans, key=lambda s: (s[1], -s[2])):
+            events.append({
+                "name": path[-1],
+                "cat": "startup",
+                "ph": "X",
+                "ts": round((start - self.origin) * 1e6, 1),
+                "dur": round((end - start) * 1e6, 1),
+                "pid": pid,
+                "tid": tid,
+            })
+        return events
+
+    def folded_stacks(self) -> list:
+        # self time per stack in µs = own duration minus direct children
+        self_time = {}
+        for path, start, end, _tid in self.spans:
+            self_time[path] = self_time.get(path, 0.0) + (end - start) * 1e6
+        for path, start, end, _tid in self.spans:
+            parent = path[:-1]
+            if parent in self_time:
+                self_time[parent] -= (end - start) * 1e6
+        return [f"{';'.join(path)} {max(0, int(us))}" for path, us in self_time.items()]
+
+    def write(self, path: str):
+        if path.endswith(".folded"):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(self.folded_stacks()) + "\n")
+            return
+        report = {
+            "traceEvents": self.trace_events(),
+            "displayTimeUnit": "ms",
+            "summary": self.summary(),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+profiler = StartupProfiler()
+
+
+def span(name: str):
+    return profiler.span(name)
@@ -0,0 +1,109 @@
+"""
+Hot reload of data files (npcs.json, ...) while the app is running.
+
+DataFileWatcher wraps a QFileSystemWatcher. When a watched file changes,
+its loader runs on the thread pool (scheduler.run_in_background), and the
+result is handed to a callback on the GUI thread:
+
+    from .reloader import DataFileWatcher
+
+    self.data_watcher = DataFileWatcher(self)
+    self.data_watcher.watch(npc_file, models.reload_npc_repository, self._on_npcs_reloaded)
+
+Editors save in bursts (truncate + write, or write a temp file and rename
+it over the original), so changes are debounced. A rename removes the path
+from QFileSystemWatcher, so it is added back afterwards. If the file is
+briefly missing, the folder is watched until it shows up again.
+"""
+
+import os
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer
+
+from .scheduler import get_scheduler
+
+
+class DataFileWatcher(QObject):
+    # quiet time after the last change before the file is re-read
+    DEBOUNCE_MS = 300
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._watcher.directoryChanged.connect(self._on_dir_changed)
+        self._handlers = {}  # path -> (load, on_loaded, on_error)
+        self._timers = {}    # path -> debounce QTimer
+
+    def watch(self, path: str, load, on_loaded, on_error=None):
+        """
+        Call load(token) on the thread pool whenever `path` changes and pass
+        its result to on_loaded(result) on the GUI thread. A change that
+        arrives while the loader is still running cancels that run.
+        """
+        path = os.path.abspath(path)
+        self._handlers[path] = (load, on_loaded, on_error)
+
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(self.DEBOUNCE_MS)
+        timer.timeout.connect(lambda p=path: self._reload(p))
+        self._timers[path] = timer
+
+        self._arm(path)
+
+    def unwatch(self, path: str):
+        path = os.path.abspath(path)
+        self._handlers.pop(path, None)
+        timer = self._timers.pop(path, None)
+        if timer is not None:
+            timer.stop()
+            timer.deleteLater()
+        if path in self._watcher.files():
+            self._watcher.removePath(path)
+        get_scheduler().cancel(("reload", path))
+
+    def watched_files(self) -> list:
+        return list(self._handlers)
+
+    # ------------------- Internals -------------------
+
+    def _arm(self, path: str) -> bool:
+        """
+        Make sure `path` is watched; watch its folder while it is missing.
+        """
+        if os.path.exists(path):
+            if path not in self._watcher.files():
+                self._watcher.addPath(path)
+            return True
+        folder = os.path.dirname(path)
+        if os.path.isdir(folder) and folder not in self._watcher.directories():
+            self._watcher.addPath(folder)
+        return False
+
+    def _on_file_changed(self, path: str):
+        path = os.path.abspath(path)
+        if path in self._timers:
+            self._timers[path].start()  # restart = debounce
+
+    def _on_dir_changed(self, folder: str):
+        folder = os.path.abspath(folder)
+        waiting = False
+        for path in self._handlers:
+            if os.path.dirname(path) != folder:
+                continue
+            if path not in self._watcher.files() and os.path.exists(path):
+                self._on_file_changed(path)
+            elif not os.path.exists(path):
+                waiting = True
+        if not waiting:
+            self._watcher.removePath(folder)
+
+    def _reload(self, path: str):
+        if not self._arm(path):
+            return  # still missing; the folder watch calls back
+        handler = self._handlers.get(path)
+        if handler is None:
+            return
+        load, on_loaded, on_error = handler
+        get_scheduler().run_in_background(("reload", path), load, on_loaded, on_error)
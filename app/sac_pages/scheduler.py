@@ -0,0 +1,179 @@
+"""
+Coalescing recompute scheduler for the UI pages.
+
+Pages register their recompute callbacks once and then call request()
+from every widget signal. All requests that arrive before control returns
+to the Qt event loop are merged into one call per callback, run by a
+zero-timeout QTimer. This is why holding an arrow key on a spinbox no
+longer triggers a full recompute per step.
+
+Heavy work can be moved off the GUI thread with run_in_background(): the
+function runs on QThreadPool and its result is delivered back on the GUI
+thread. Only the newest job per key delivers, so results from jobs that
+were overtaken by a newer request are dropped.
+
+    from .scheduler import get_scheduler
+
+    self._recompute_key = get_scheduler().register(self._refresh)
+    ...
+    get_scheduler().request(self._recompute_key)
+"""
+
+import itertools
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+
+class CancelToken:
+    """
+    Passed to background jobs; long loops can poll is_cancelled() and stop
+    early once a newer job for the same key has been submitted.
+    """
+
+    __slots__ = ("_cancelled",)
+
+    def __init__(self):
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+
+class _JobSignals(QObject):
+    finished = Signal(object, object)  # job id, result
+    failed = Signal(object, object)    # job id, exception
+
+
+class _Job(QRunnable):
+    def __init__(self, job_id, func, token, signals):
+        super().__init__()
+        self.job_id = job_id
+        self.func = func
+        self.token = token
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = self.func(self.token)
+        except Exception as e:  # delivered to on_error on the GUI thread
+            self.signals.failed.emit(self.job_id, e)
+        else:
+            self.signals.finished.emit(self.job_id, result)
+
+
+class RecomputeScheduler(QObject):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ids = itertools.count(1)
+        self._callbacks = {}
+        self._pending = {}  # insertion ordered, used as ordered set
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+
+        self._pool = QThreadPool.globalInstance()
+        self._signals = _JobSignals()
+        self._signals.finished.connect(self._on_job_finished)
+        self._signals.failed.connect(self._on_job_failed)
+        self._latest_job = {}  # key -> job id
+        self._jobs = {}        # job id -> (key, token, on_done, on_error)
+
+    # ------------------- Coalesced callbacks -------------------
+
+    def register(self, callback) -> int:
+        key = next(self._ids)
+        self._callbacks[key] = callback
+        return key
+
+    def unregister(self, key: int):
+        self._callbacks.pop(key, None)
+        self._pending.pop(key, None)
+        self.cancel(key)
+
+    def request(self, key: int):
+        """
+        Run the callback registered under `key` on the next event-loop tick.
+        Repeated requests before that tick are merged.
+        """
+        if key not in self._callbacks:
+            return
+        self._pending[key] = None
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """
+        Run all pending callbacks now (in request order).
+        """
+        self._timer.stop()
+        pending = list(self._pending)
+        self._pending.clear()
+        for key in pending:
+            callback = self._callbacks.get(key)
+            if callback is not None:
+                callback()
+
+    # ------------------- Background jobs -------------------
+
+    def run_in_background(self, key, func, on_done, on_error=None) -> CancelToken:
+        """
+        Run func(token) on the thread pool; on_done(result) is called on the
+        GUI thread, unless another job for the same `key` was submitted in
+        the meantime (the older job's token is cancelled).
+        """
+        self.cancel(key)
+        job_id = next(self._ids)
+        token = CancelToken()
+        self._latest_job[key] = job_id
+        self._jobs[job_id] = (key, token, on_done, on_error)
+        self._pool.start(_Job(job_id, func, token, self._signals))
+        return token
+
+    def cancel(self, key):
+        job_id = self._latest_job.pop(key, None)
+        if job_id is not None and job_id in self._jobs:
+            self._jobs[job_id][1].cancel()
+
+    def is_running(self, key) -> bool:
+        """
+        True while the newest job for `key` has not delivered yet.
+        """
+        return key in self._latest_job
+
+    def _take_job(self, job_id):
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return None
+        key, token, _on_done, _on_error = job
+        if token.is_cancelled() or self._latest_job.get(key) != job_id:
+            return None
+        del self._latest_job[key]
+        return job
+
+    def _on_job_finished(self, job_id, result):
+        job = self._take_job(job_id)
+        if job is not None:
+            job[2](result)
+
+    def _on_job_failed(self, job_id, error):
+        job = self._take_job(job_id)
+        if job is not None and job[3] is not None:
+            job[3](error)
+
+
+_scheduler = None
+
+
+def get_scheduler() -> RecomputeScheduler:
+    """
+    Process-wide scheduler (created on first use; needs a QApplication).
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RecomputeScheduler()
+    return _scheduler
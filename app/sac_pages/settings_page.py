@@ -1,6 +1,21 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QHBoxLayout, QComboBox, QCheckBox
+import logging
+
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QLabel,
+    QHBoxLayout,
+    QComboBox,
+    QCheckBox,
+    QGroupBox,
+    QPlainTextEdit,
+    QPushButton,
+)
+from PySide6.QtGui import QFontDatabase
 from PySide6.QtCore import Qt
 
+from .logs import counters, ring_buffer
+
 
 class SettingsPage(QWidget):
     def __init__(self, on_language_change=None, on_rgb_toggle=None, on_name_style_change=None):
@@ -55,12 +70,37 @@ class SettingsPage(QWidget):
         row_style.addStretch()
         row_style.addWidget(self.combo_style)
 
+        # Diagnostics (log ring buffer + counters), filled when shown
+        self.grp_diag = QGroupBox()
+        diag_layout = QVBoxLayout(self.grp_diag)
+        row_diag = QHBoxLayout()
+        self.combo_log_level = QComboBox()
+        self.combo_log_level.addItem("Info", userData=logging.INFO)
+        self.combo_log_level.addItem("Debug", userData=logging.DEBUG)
+        self.combo_log_level.addItem("Warnings", userData=logging.WARNING)
+        self.combo_log_level.currentIndexChanged.connect(self.refresh_diagnostics)
+        self.btn_refresh_log = QPushButton()
+        self.btn_refresh_log.clicked.connect(self.refresh_diagnostics)
+        self.lbl_counters = QLabel()
+        self.lbl_counters.setWordWrap(True)
+        self.lbl_counters.setStyleSheet("color: #aaaaaa; font-size: 11px;")
+        row_diag.addWidget(self.combo_log_level)
+        row_diag.addStretch()
+        row_diag.addWidget(self.btn_refresh_log)
+        self.txt_log = QPlainTextEdit()
+        self.txt_log.setReadOnly(True)
+        self.txt_log.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.txt_log.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        diag_layout.addLayout(row_diag)
+        diag_layout.addWidget(self.lbl_counters)
+        diag_layout.addWidget(self.txt_log, 1)
+
         layout.addWidget(self.heading)
         layout.addWidget(self.desc)
         layout.addLayout(row_lang)
         layout.addLayout(row_rgb)
         layout.addLayout(row_style)
-        layout.addStretch()
+        layout.addWidget(self.grp_diag, 1)
 
         self.set_language(self.language)
 
@@ -80,6 +120,17 @@ class SettingsPage(QWidget):
         if self.on_name_style_change and style:
             self.on_name_style_change(style)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_diagnostics()
+
+    def refresh_diagnostics(self, *_args):
+        # records are only formatted here, not when they are logged
+        level = self.combo_log_level.currentData() or logging.INFO
+        self.txt_log.setPlainText("\n".join(ring_buffer.lines(level)))
+        self.txt_log.verticalScrollBar().setValue(self.txt_log.verticalScrollBar().maximum())
+        self.lbl_counters.setText("  |  ".join(f"{k}: {v}" for k, v in counters.snapshot().items()))
+
     def set_language(self, lang: str):
         self.language = lang
         if lang == "de":
@@ -87,10 +138,14 @@ class SettingsPage(QWidget):
             self.desc.setText("Sprache, RGB-Design und Namensstil (Vanilla/Mod) anpassen.")
             self.lbl_lang.setText("Sprache:")
             self.lbl_rgb.setText("RGB-Effekte aktivieren:")
-            self.lbl_style.setText("Namenstil (Laser/Munition):")
+            self.lbl_style.setText("Namensstil (Items/NPCs):")
+            self.grp_diag.setTitle("Diagnose (Log)")
+            self.btn_refresh_log.setText("Aktualisieren")
         else:
             self.heading.setText("Settings")
             self.desc.setText("Adjust language, RGB look and name style (Vanilla/Mod).")
             self.lbl_lang.setText("Language:")
             self.lbl_rgb.setText("Enable RGB effects:")
-            self.lbl_style.setText("Name style (lasers/ammo):")
+            self.lbl_style.setText("Name style (items/NPCs):")
+            self.grp_diag.setTitle("Diagnostics (log)")
+            self.btn_refresh_log.setText("Refresh")
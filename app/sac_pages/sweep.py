@@ -0,0 +1,230 @@
+"""
+Headless multi-process build sweeps for the Damage Calculator.
+
+Evaluates large grids of DamagePage-style states on all CPU cores and
+streams the results back in input order, so memory stays flat no matter how
+big the grid is.
+
+From code:
+
+    from sac_pages import sweep
+
+    axes = {
+        "skills.saturn_conqueror": range(6),
+        "drones.IRIS.level": range(1, 17),
+        "laser_groups.0.upgrade": range(17),
+    }
+    for values, result in sweep.sweep_grid(base_state, axes):
+        ...
+
+From the command line (run inside app/):
+
+    python -m sac_pages.sweep spec.json -o results.jsonl --workers 8
+
+spec.json holds {"base_state": {...}, "axes": {"path": [values] | {"range": [start, stop, step]}}}.
+"""
+
+import argparse
+import collections
+import copy
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import models
+
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# per-worker grid description, set once by _init_grid_worker()
+_worker_base_state = None
+_worker_paths = None
+
+
+# ------------------------------------------------------------------
+# Worker side
+# ------------------------------------------------------------------
+
+def _init_grid_worker(base_state: dict, paths: list):
+    global _worker_base_state, _worker_paths
+    _worker_base_state = base_state
+    _worker_paths = paths
+
+
+def _grid_states(rows: list):
+    # one working copy, updated in place: the batch consumes each state
+    # before the next one is produced
+    state = copy.deepcopy(_worker_base_state)
+    for row in rows:
+        for path, value in zip(_worker_paths, row):
+            models._set_path(state, path, value)
+        yield state
+
+
+def _eval_grid_chunk(rows: list) -> dict:
+    # only the axis values travel to the worker; states are rebuilt here
+    return models.calculate_damage_overview_batch(_grid_states(rows))
+
+
+def _eval_state_chunk(states: list) -> dict:
+    return models.calculate_damage_overview_batch(states)
+
+
+# ------------------------------------------------------------------
+# Streaming
+# ------------------------------------------------------------------
+
+def _chunked(iterable, size: int):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _rows(columns: dict):
+    fields = models.OVERVIEW_FIELDS
+    for values in zip(*(columns[f] for f in fields)):
+        yield dict(zip(fields, values))
+
+
+def _stream(chunks, func, workers, initializer=None, initargs=(), max_pending=None, progress=None, total=None):
+    """
+    Run func over chunks and yield (chunk, result_columns) in input order.
+
+    At most max_pending chunks are queued at once, so neither inputs nor
+    results pile up when the consumer is slower than the pool.
+    """
+    done = 0
+
+    if workers == 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for chunk in chunks:
+            columns = func(chunk)
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+            yield chunk, columns
+        return
+
+    max_pending = max_pending or workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        pending = collections.deque()
+        chunks = iter(chunks)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                pending.append((chunk, executor.submit(func, chunk)))
+            if not pending:
+                break
+            chunk, future = pending.popleft()
+            columns = future.result()
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+            yield chunk, columns
+
+
+def grid_size(axes: dict) -> int:
+    total = 1
+    for values in axes.values():
+        total *= len(values)
+    return total
+
+
+def sweep_grid(base_state: dict, axes: dict, workers: int | None = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE, max_pending: int | None = None, progress=None):
+    """
+    Evaluate every combination of `axes` on top of `base_state`.
+
+    `axes` maps dotted state paths (see models.iter_column_states()) to the
+    values to try. Yields (values, result) per grid point in
+    itertools.product order, where `values` is the tuple of axis values and
+    `result` the calculate_damage_overview() dict.
+
+    `progress(done, total)` is called after every finished chunk.
+    """
+    paths = list(axes)
+    value_lists = [list(axes[p]) for p in paths]
+    total = grid_size(dict(zip(paths, value_lists)))
+    workers = workers or os.cpu_count() or 1
+
+    chunks = _chunked(itertools.product(*value_lists), chunk_size)
+    for rows, columns in _stream(chunks, _eval_grid_chunk, workers, _init_grid_worker, (base_state, paths),
+                                 max_pending, progress, total):
+        yield from zip(rows, _rows(columns))
+
+
+def sweep_states(states, workers: int | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_pending: int | None = None, progress=None, total: int | None = None):
+    """
+    Evaluate an iterable of full state dicts; yields (state, result) in order.
+
+    Prefer sweep_grid() for regular grids: it only ships axis values to the
+    workers instead of whole states.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunked(states, chunk_size)
+    for chunk, columns in _stream(chunks, _eval_state_chunk, workers, None, (), max_pending, progress, total):
+        yield from zip(chunk, _rows(columns))
+
+
+# ------------------------------------------------------------------
+# Command line
+# ------------------------------------------------------------------
+
+def _parse_axes(raw_axes: dict) -> dict:
+    axes = {}
+    for path, spec in raw_axes.items():
+        if isinstance(spec, dict) and "range" in spec:
+            axes[path] = range(*spec["range"])
+        elif isinstance(spec, list):
+            axes[path] = spec
+        else:
+            raise ValueError(f"axis {path!r}: expected a list or {{\"range\": [...]}}")
+    return axes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run a damage calculator build sweep.")
+    parser.add_argument("spec", help="JSON file with base_state and axes")
+    parser.add_argument("-o", "--output", help="write JSON lines here (default: stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    with open(args.spec, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    axes = _parse_axes(spec.get("axes", {}))
+    paths = list(axes)
+
+    started = time.perf_counter()
+
+    def _progress(done, total):
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        print(f"\r[sweep] {done:,} / {total:,} ({rate:,.0f} states/s)", end="", file=sys.stderr, flush=True)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for values, result in sweep_grid(spec["base_state"], axes, workers=args.workers,
+                                         chunk_size=args.chunk_size, progress=_progress):
+            out.write(json.dumps({"values": dict(zip(paths, values)), "result": result}) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,41 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel
+import html
+
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QComboBox,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
+    QTextBrowser,
+)
 from PySide6.QtCore import Qt
 
+from .logs import get_logger
+from .scheduler import get_scheduler
+from .wiki_store import open_wiki_store, replace_wiki_store, serialize_wiki_store
+
+
+log = get_logger("wiki")
+
 
 class WikiPage(QWidget):
+    """
+    Wiki: category -> entry list -> details.
+
+    Backed by wiki_store (memory-mapped); entry details are only decoded
+    when an entry is selected. Typing in the search box replaces the list
+    with matches from all categories (vanilla and MOD names).
+    """
+
+    SEARCH_LIMIT = 200
+
     def __init__(self):
         super().__init__()
         self.language = "en"
+        self.store = open_wiki_store()
         self._init_ui()
 
     def _init_ui(self):
@@ -19,14 +49,129 @@ class WikiPage(QWidget):
         self.desc.setWordWrap(True)
         layout.addWidget(self.heading)
         layout.addWidget(self.desc)
-        layout.addStretch()
+
+        # Category
+        row_cat = QHBoxLayout()
+        self.lbl_category = QLabel()
+        self.cmb_category = QComboBox()
+        for cat_id, title in self.store.categories():
+            self.cmb_category.addItem(title, cat_id)
+        self.cmb_category.currentIndexChanged.connect(self._on_category_changed)
+        row_cat.addWidget(self.lbl_category)
+        row_cat.addWidget(self.cmb_category)
+        row_cat.addStretch()
+
+        # Search
+        self.txt_search = QLineEdit()
+        self.txt_search.setClearButtonEnabled(True)
+        self.txt_search.setMinimumWidth(240)
+        self.txt_search.textChanged.connect(self._on_search_changed)
+        row_cat.addWidget(self.txt_search)
+        layout.addLayout(row_cat)
+
+        # Entries + details
+        body = QHBoxLayout()
+        self.list_entries = QListWidget()
+        self.list_entries.setMaximumWidth(280)
+        self.list_entries.currentItemChanged.connect(self._on_entry_changed)
+        self.details = QTextBrowser()
+        body.addWidget(self.list_entries)
+        body.addWidget(self.details, 1)
+        layout.addLayout(body, 1)
+
         self.set_language(self.language)
+        self._on_category_changed(self.cmb_category.currentIndex())
+
+    # ------------------- Handlers -------------------
+
+    def _fill_list(self, rows):
+        # rows: (cat_id, key, list text, title)
+        self.list_entries.clear()
+        self.details.clear()
+        for cat_id, key, text, title in rows:
+            item = QListWidgetItem(text)
+            item.setData(Qt.UserRole, (cat_id, key, title))
+            self.list_entries.addItem(item)
+        if self.list_entries.count():
+            self.list_entries.setCurrentRow(0)
+
+    def _on_category_changed(self, _index: int):
+        if self.txt_search.text().strip():
+            self.txt_search.clear()  # shows the category via _on_search_changed
+            return
+        cat_id = self.cmb_category.currentData()
+        if not cat_id:
+            self._fill_list([])
+            return
+        self._fill_list((cat_id, key, title, title) for key, title in self.store.entries(cat_id))
+
+    def _on_search_changed(self, text: str):
+        if not text.strip():
+            self._on_category_changed(self.cmb_category.currentIndex())
+            return
+        titles = {self.cmb_category.itemData(i): self.cmb_category.itemText(i) for i in range(self.cmb_category.count())}
+        self._fill_list(
+            (cat_id, key, f"{title}  ·  {titles.get(cat_id, cat_id)}", title)
+            for cat_id, key, title in self.store.search(text, limit=self.SEARCH_LIMIT)
+        )
+
+    def _on_entry_changed(self, current, _previous):
+        if current is None:
+            self.details.clear()
+            return
+        cat_id, key, title = current.data(Qt.UserRole)
+        entry = self.store.entry(cat_id, key)
+        self.details.setHtml(self._entry_html(title, entry or {}))
+
+    def _entry_html(self, title: str, entry: dict) -> str:
+        rows = []
+        for field, value in entry.items():
+            label = field.replace("_", " ")
+            rows.append(
+                f"<tr><td style='color:#999999; padding-right:12px'>{html.escape(label)}</td>"
+                f"<td>{html.escape(str(value))}</td></tr>"
+            )
+        return f"<h3>{html.escape(title)}</h3><table>{''.join(rows)}</table>"
+
+    def _on_store_rebuilt(self, data: bytes):
+        current = self.list_entries.currentItem()
+        selected = current.data(Qt.UserRole)[:2] if current is not None else None
+
+        self.store.close()
+        self.store = replace_wiki_store(data)
+        self._on_search_changed(self.txt_search.text())  # refills the list
+
+        # keep the shown entry if it still exists
+        for row in range(self.list_entries.count()):
+            if self.list_entries.item(row).data(Qt.UserRole)[:2] == selected:
+                self.list_entries.setCurrentRow(row)
+                break
+
+    # ------------------- Public API -------------------
+
+    def apply_npc_changes(self, repo, diff: dict):
+        """
+        Hot reload of npcs.json: the NPC category of the store comes from
+        it, so the store is rebuilt on the thread pool and swapped in.
+        """
+        get_scheduler().run_in_background(
+            ("wiki_store", id(self)),
+            lambda _token: serialize_wiki_store(),
+            self._on_store_rebuilt,
+            lambda e: log.error("rebuilding the wiki store failed: %r", e),
+        )
 
     def set_language(self, lang: str):
         self.language = lang
+        for i, (_cat_id, title) in enumerate(self.store.categories(lang)):
+            self.cmb_category.setItemText(i, title)
         if lang == "de":
             self.heading.setText("Wiki")
             self.desc.setText("Zentrales Nachschlagewerk für Schiffe, NPCs, Items und Karten.")
+            self.lbl_category.setText("Kategorie:")
+            self.txt_search.setPlaceholderText("Suchen (z. B. LF-3, Lordakia, Prometheus) ...")
         else:
             self.heading.setText("Wiki")
             self.desc.setText("Central knowledge base for ships, NPCs, items and maps.")
+            self.lbl_category.setText("Category:")
+            self.txt_search.setPlaceholderText("Search (e.g. LF-3, Lordakia, Prometheus) ...")
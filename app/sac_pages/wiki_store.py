@@ -0,0 +1,483 @@
+"""
+Memory-mapped, offset-indexed store behind the Wiki page.
+
+wiki.store is generated from the data pack and npcs.json (next to them;
+delete it any time, it is rebuilt when missing or when a source file
+changed):
+
+    b"SACWIKI1" | u32 index length | index (JSON) | entry bodies (JSON)
+                                                  | search index (JSON)
+
+The index only holds categories, entry titles and (offset, length) of each
+body. Opening the Wiki reads the index; a body is decoded when its entry
+is shown, so only the touched pages of the mapped file are ever read.
+
+The search index (sorted token list + entry ids per token, over names,
+ids, vanilla/MOD names and the EN/DE category titles) is prebuilt too and
+only decoded on the first search(). Every query word is prefix-matched by
+binary search in the token list; words without a prefix match fall back to
+fuzzy matching (symmetric delete, one edit).
+
+    store = open_wiki_store()
+    for cat_id, title in store.categories():
+        for key, name in store.entries(cat_id):
+            ...
+    store.entry("lasers", "LW3")  # -> {"id": "LW3", "name_en": ..., ...}
+    store.search("lf 3")          # -> [("lasers", "LW3", "LW-3 (LF-3)"), ...]
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+
+from . import models, profiling
+from .datapack import get_data_pack, get_pack_dir
+from .logs import get_logger
+
+
+MAGIC = b"SACWIKI1"
+STORE_FORMAT = 2
+
+_HEADER = struct.Struct("<8sI")
+
+log = get_logger("wiki")
+
+
+def get_store_file() -> str:
+    # next to the pack folder: app/data in dev mode, the EXE folder when frozen
+    return os.path.join(os.path.dirname(get_pack_dir()), "wiki.store")
+
+
+# ------------------------------------------------------------------
+# Building
+# ------------------------------------------------------------------
+
+def _source_files() -> list:
+    pack = get_data_pack()
+    files = [os.path.join(pack.pack_dir, "manifest.json")]
+    files += [pack.section_file(name) for name in pack.section_names()]
+    files.append(models._get_npc_file()[0])
+    return files
+
+
+def _source_stamps(files: list) -> dict:
+    stamps = {}
+    for path in files:
+        try:
+            st = os.stat(path)
+            stamps[os.path.basename(path)] = [st.st_size, st.st_mtime_ns]
+        except OSError:
+            stamps[os.path.basename(path)] = None
+    return stamps
+
+
+def _collect_categories() -> list:
+    """
+    [(cat_id, {lang: title}, [(key, title, body dict), ...]), ...] from
+    npcs.json and every data pack section.
+    """
+    categories = []
+
+    npcs = []
+    for entry in models._read_npc_entries():
+        if isinstance(entry, dict) and "id" in entry:
+            npcs.append((str(entry["id"]), str(entry.get("name", entry["id"])), entry))
+    categories.append(("npcs", {"en": "NPCs", "de": "NPCs"}, npcs))
+
+    pack = get_data_pack()
+    for name in pack.section_names():
+        entries = []
+        for key, data in pack.section(name).items():
+            body = {"id": key}
+            body.update(data)
+            entries.append((key, str(data.get("name_en", key)), body))
+        titles = {lang: pack.title(name, lang) for lang in ("en", "de")}
+        categories.append((name, titles, entries))
+    return categories
+
+
+# ------------------------------------------------------------------
+# Search tokens
+# ------------------------------------------------------------------
+
+# prefixes up to this length have prebuilt entry lists
+SHORT_PREFIX_LEN = 2
+
+# fields whose text is searchable, besides the entry title and id
+_NAME_FIELDS = ("name", "name_en", "name_de", "name_mod")
+
+
+def _split_words(text: str) -> list:
+    # "LW-3 (LF-3)" -> ["lw-3", "lf-3"]
+    word = []
+    words = []
+    for ch in text.casefold():
+        if ch.isalnum() or ch in "-_.'":
+            word.append(ch)
+        elif word:
+            words.append("".join(word))
+            word = []
+    if word:
+        words.append("".join(word))
+    return words
+
+
+def _compact(word: str) -> str:
+    return "".join(ch for ch in word if ch.isalnum())
+
+
+def search_tokens(text: str) -> set:
+    """
+    Tokens for one name: every word without punctuation ("lw3") plus its
+    parts ("lw", "3"), so "LF-3", "lf3" and "lf 3" all find LW-3 (LF-3).
+    """
+    tokens = set()
+    for word in _split_words(text):
+        compact = _compact(word)
+        if compact:
+            tokens.add(compact)
+        part = []
+        for ch in word:
+            if ch.isalnum():
+                part.append(ch)
+            elif part:
+                tokens.add("".join(part))
+                part = []
+        if part:
+            tokens.add("".join(part))
+    return tokens
+
+
+def query_words(query: str) -> list:
+    return [w for w in (_compact(word) for word in _split_words(query)) if w]
+
+
+def _entry_names(cat_id: str, cat_titles: dict, title: str, key: str, body: dict) -> list:
+    names = [title, key] + list(cat_titles.values())
+    names += [body[f] for f in _NAME_FIELDS if isinstance(body.get(f), str)]
+    if cat_id == "npcs":
+        mod_name = models.NPC_MOD_NAME_MAP.get(body.get("name", ""))
+        if mod_name:
+            names.append(mod_name)
+    return names
+
+
+def _build_search_index(categories: list) -> dict:
+    postings = {}
+    entry_id = 0
+    for cat_id, cat_titles, entries in categories:
+        for key, title, body in entries:
+            tokens = set()
+            for name in _entry_names(cat_id, cat_titles, title, key, body):
+                tokens |= search_tokens(name)
+            for token in tokens:
+                postings.setdefault(token, []).append(entry_id)
+            entry_id += 1
+    vocab = sorted(postings)
+
+    # short prefixes match a large part of the vocabulary, so their merged
+    # entry lists are prebuilt as well
+    short = {}
+    for token in vocab:
+        for n in range(1, min(len(token), SHORT_PREFIX_LEN) + 1):
+            short.setdefault(token[:n], set()).update(postings[token])
+    return {
+        "vocab": vocab,
+        "postings": [postings[t] for t in vocab],
+        "short": {prefix: sorted(ids) for prefix, ids in short.items()},
+    }
+
+
+def serialize_wiki_store(stamps: dict | None = None) -> bytes:
+    if stamps is None:
+        stamps = _source_stamps(_source_files())
+
+    with profiling.span("wiki store: build"):
+        index = {"format": STORE_FORMAT, "sources": stamps, "categories": []}
+        bodies = []
+        offset = 0
+        categories = _collect_categories()
+        for cat_id, cat_titles, entries in categories:
+            rows = []
+            for key, entry_title, body in entries:
+                raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                rows.append([key, entry_title, offset, len(raw)])
+                bodies.append(raw)
+                offset += len(raw)
+            index["categories"].append({"id": cat_id, "titles": cat_titles, "entries": rows})
+
+        search_raw = json.dumps(_build_search_index(categories), ensure_ascii=False).encode("utf-8")
+        index["search"] = [offset, len(search_raw)]
+        bodies.append(search_raw)
+
+        index_raw = json.dumps(index, ensure_ascii=False).encode("utf-8")
+        return _HEADER.pack(MAGIC, len(index_raw)) + index_raw + b"".join(bodies)
+
+
+def build_wiki_store(path: str, data: bytes | None = None):
+    """
+    Write wiki.store to `path` (atomically).
+    """
+    if data is None:
+        data = serialize_wiki_store()
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(data)
+    os.replace(tmp_file, path)
+
+
+# ------------------------------------------------------------------
+# Reading
+# ------------------------------------------------------------------
+
+def _read_index(buf) -> tuple[dict, int]:
+    if len(buf) < _HEADER.size:
+        raise ValueError("wiki store too short")
+    magic, index_len = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("not a wiki store")
+    start = _HEADER.size
+    index = json.loads(bytes(buf[start:start + index_len]).decode("utf-8"))
+    if index.get("format") != STORE_FORMAT:
+        raise ValueError(f"unsupported wiki store format {index.get('format')!r}")
+    return index, start + index_len
+
+
+class SearchIndex:
+    # match results kept for the last few query words, so typing only
+    # re-matches the word that changed
+    CACHE_SIZE = 64
+
+    def __init__(self, vocab: list, postings: list, short: dict):
+        self.vocab = vocab
+        self.postings = postings
+        self.short = short
+        self._deletes = None  # built on the first fuzzy lookup
+        self._lists = {}
+        self._sets = {}
+
+    @classmethod
+    def _cached(cls, cache: dict, word: str, func):
+        result = cache.get(word)
+        if result is None:
+            result = func(word)
+            if len(cache) >= cls.CACHE_SIZE:
+                del cache[next(iter(cache))]
+            cache[word] = result
+        return result
+
+    def match(self, word: str) -> tuple:
+        """
+        (exact, prefix, matched) sorted entry id lists for one query word:
+        entries with `word` as a token, with a token starting with `word`,
+        and everything that matched (prefix, or fuzzy if there is no prefix
+        hit).
+        """
+        return self._cached(self._lists, word, self._match)
+
+    def match_sets(self, word: str) -> tuple:
+        return self._cached(self._sets, word, lambda w: tuple(set(ids) for ids in self.match(w)))
+
+    def _match(self, word: str) -> tuple:
+        vocab, postings = self.vocab, self.postings
+        lo = bisect.bisect_left(vocab, word)
+        # the tokens starting with `word` are vocab[lo:hi]
+        hi = bisect.bisect_left(vocab, word + "\U0010ffff", lo)
+
+        if lo < hi:
+            if len(word) <= SHORT_PREFIX_LEN:
+                prefix = self.short[word]
+            else:
+                prefix = sorted(set().union(*postings[lo:hi]))
+            exact = postings[lo] if vocab[lo] == word else []
+            return exact, prefix, prefix
+
+        fuzzy = set()
+        if len(word) >= 3:
+            for token_id in self._fuzzy(word):
+                fuzzy.update(postings[token_id])
+        return [], [], sorted(fuzzy)
+
+    @staticmethod
+    def _delete_variants(word: str):
+        yield word
+        for i in range(len(word)):
+            yield word[:i] + word[i + 1:]
+
+    def _fuzzy(self, word: str) -> set:
+        if self._deletes is None:
+            deletes = {}
+            for token_id, token in enumerate(self.vocab):
+                if len(token) >= 3:
+                    for variant in self._delete_variants(token):
+                        deletes.setdefault(variant, []).append(token_id)
+            self._deletes = deletes
+        found = set()
+        for variant in self._delete_variants(word):
+            found.update(self._deletes.get(variant, ()))
+        return found
+
+
+class WikiStore:
+    """
+    Read-only view on a wiki.store buffer (an mmap, or bytes when the file
+    could not be written).
+    """
+
+    def __init__(self, buf, file=None):
+        self._buf = buf
+        self._file = file
+        index, self._data_start = _read_index(buf)
+        self.sources = index.get("sources", {})
+        self._search_ref = index["search"]
+        self._search = None
+        self._categories = []
+        self._entries = {}  # cat_id -> [(key, title, offset, length), ...]
+        self._by_key = {}   # cat_id -> {key: position}
+        self._entry_ids = []  # search entry id -> (cat_id, key, title)
+        for cat in index["categories"]:
+            self._categories.append((cat["id"], cat["titles"]))
+            rows = [tuple(row) for row in cat["entries"]]
+            self._entry_ids += [(cat["id"], row[0], row[1]) for row in rows]
+            self._entries[cat["id"]] = rows
+            self._by_key[cat["id"]] = {row[0]: i for i, row in enumerate(rows)}
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        if self._file is not None:
+            self._file.close()
+        self._buf = b""
+        self._file = None
+
+    def categories(self, lang: str = "en") -> list:
+        """
+        [(cat_id, title), ...] with titles in `lang` (en/de).
+        """
+        return [(cat_id, titles.get(lang, titles.get("en", cat_id))) for cat_id, titles in self._categories]
+
+    def entries(self, cat_id: str) -> list:
+        """
+        [(key, title), ...] in source order.
+        """
+        return [(row[0], row[1]) for row in self._entries.get(cat_id, ())]
+
+    def _decode(self, offset: int, length: int):
+        start = self._data_start + offset
+        return json.loads(bytes(self._buf[start:start + length]).decode("utf-8"))
+
+    def entry(self, cat_id: str, key: str):
+        position = self._by_key.get(cat_id, {}).get(key)
+        if position is None:
+            return None
+        _key, _title, offset, length = self._entries[cat_id][position]
+        return self._decode(offset, length)
+
+    def search(self, query: str, limit: int = 100) -> list:
+        """
+        [(cat_id, key, title), ...] of entries matching every word of
+        `query`; exact token matches first, then prefix, then fuzzy.
+        """
+        words = query_words(query)
+        if not words:
+            return []
+        if self._search is None:
+            raw = self._decode(*self._search_ref)
+            self._search = SearchIndex(raw["vocab"], raw["postings"], raw["short"])
+
+        if len(words) == 1:
+            # sorted lists are enough, no need to touch every hit
+            exact, _prefix, matched = self._search.match(words[0])
+            best = exact[:limit]
+            if len(best) < limit:
+                seen = set(best)
+                for entry_id in matched:
+                    if entry_id not in seen:
+                        best.append(entry_id)
+                        if len(best) >= limit:
+                            break
+            return [self._entry_ids[entry_id] for entry_id in best]
+
+        matches = [self._search.match_sets(word) for word in words]
+        matched = set.intersection(*sorted((m[2] for m in matches), key=len))
+        if not matched:
+            return []
+        exact = set.intersection(*(m[0] for m in matches))
+        prefix = set.intersection(*(m[1] for m in matches))
+
+        # all words exact, then all words at least prefix, then fuzzy;
+        # source order within each group
+        best = []
+        for group in (exact, prefix - exact, matched - prefix):
+            if len(best) >= limit:
+                break
+            best += sorted(group)[:limit - len(best)]
+        return [self._entry_ids[entry_id] for entry_id in best]
+
+
+def _map_file(path: str) -> WikiStore:
+    f = open(path, "rb")
+    try:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        f.close()
+        raise
+    try:
+        return WikiStore(buf, f)
+    except Exception:
+        buf.close()
+        f.close()
+        raise
+
+
+_store_lock = threading.Lock()
+
+
+def open_wiki_store(path: str | None = None) -> WikiStore:
+    """
+    Map wiki.store, (re)building it first if it is missing, unreadable or
+    older than its sources.
+    """
+    path = path or get_store_file()
+    stamps = _source_stamps(_source_files())
+
+    with _store_lock:
+        try:
+            store = _map_file(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            # missing or damaged -> rebuild
+            store = None
+        if store is not None:
+            if store.sources == stamps:
+                return store
+            store.close()  # Windows cannot replace a mapped file
+            log.info("wiki store %s is out of date, rebuilding", path)
+        else:
+            log.info("building wiki store %s", path)
+
+        return _write_and_map(path, serialize_wiki_store(stamps))
+
+
+def _write_and_map(path: str, data: bytes) -> WikiStore:
+    try:
+        build_wiki_store(path, data)
+        return _map_file(path)
+    except (OSError, ValueError) as e:
+        # read-only install folder etc.: serve the store from memory
+        log.warning("could not write wiki store %s (%r), serving it from memory", path, e)
+        return WikiStore(data)
+
+
+def replace_wiki_store(data: bytes, path: str | None = None) -> WikiStore:
+    """
+    Write `data` (from serialize_wiki_store(), e.g. built on the thread
+    pool after npcs.json changed) as wiki.store and map it. Close the old
+    store first: Windows cannot replace a mapped file.
+    """
+    path = path or get_store_file()
+    with _store_lock:
+        log.info("wiki store %s rebuilt", path)
+        return _write_and_map(path, data)
@@ -0,0 +1,43 @@
+"""
+compile_state() checks. Run inside app/:
+
+    python -m pytest tests
+"""
+
+import copy
+import unittest
+
+from sac_pages import models
+
+
+def _state(**changes) -> dict:
+    state = copy.deepcopy(models.DEFAULT_DAMAGE_STATE)
+    state.update(changes)
+    return state
+
+
+class CompileStateTest(unittest.TestCase):
+    def test_matches_scalar_overview(self):
+        state = _state(formation=next(iter(models.FORMATIONS)))
+        state["rockets"]["type"] = next(r for r in models.ROCKETS if r != "NONE")
+        self.assertEqual(models.compile_state(state).overview(), models.calculate_damage_overview(state))
+
+    def test_invalid_states_rejected(self):
+        missing_skills = _state()
+        del missing_skills["skills"]
+        invalid = {
+            "empty": {},
+            "formation only": {"formation": "XX"},
+            "unknown formation": _state(formation="XX"),
+            "missing section": missing_skills,
+            "wrong section type": _state(drones=[]),
+            "bad count": _state(laser_groups=[{"type": "LW3", "count": "many", "upgrade": 0}]),
+            "not a dict": None,
+        }
+        for label, state in invalid.items():
+            with self.subTest(label), self.assertRaises(ValueError):
+                models.compile_state(state)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Source fingerprint checks for the compiled data. Run inside app/:
+
+    python -m pytest tests
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from sac_pages import datapack
+
+
+class FingerprintMatchesTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        self.path = os.path.join(self._dir.name, "lasers.json")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('{"LW3": {}}')
+        self.fingerprint = datapack.file_fingerprint(self.path)
+        self.stamp = datapack.file_stamp(self.path)
+
+        self.hashed = []
+        real = datapack.file_fingerprint
+
+        def spy(path):
+            self.hashed.append(path)
+            return real(path)
+
+        patcher = mock.patch.object(datapack, "file_fingerprint", spy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _touch(self):
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    def test_unchanged_stamp_is_not_hashed(self):
+        self.assertTrue(datapack.fingerprint_matches(self.path, self.fingerprint, self.stamp))
+        self.assertEqual(self.hashed, [])
+
+    def test_touched_file_is_hashed(self):
+        self._touch()
+        self.assertTrue(datapack.fingerprint_matches(self.path, self.fingerprint, self.stamp))
+        self.assertEqual(self.hashed, [self.path])
+
+    def test_same_size_edit_is_detected(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('{"LW4": {}}')
+        self._touch()
+        self.assertFalse(datapack.fingerprint_matches(self.path, self.fingerprint, self.stamp))
+
+    def test_size_change_needs_no_hash(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n")
+        self.assertFalse(datapack.fingerprint_matches(self.path, self.fingerprint, self.stamp))
+        self.assertEqual(self.hashed, [])
+
+    def test_without_stamp_falls_back_to_hash(self):
+        self.assertTrue(datapack.fingerprint_matches(self.path, self.fingerprint))
+        self.assertEqual(self.hashed, [self.path])
+
+
+class PackSectionTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        sections = {"lasers": "lasers.json", "ammo": "ammo.json"}
+        with open(os.path.join(self._dir.name, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({"format": 1, "sections": {k: {"file": v} for k, v in sections.items()}}, f)
+        with open(os.path.join(self._dir.name, "lasers.json"), "w", encoding="utf-8") as f:
+            json.dump({"LW3": {"base_damage": 150}}, f)
+        with open(os.path.join(self._dir.name, "ammo.json"), "w", encoding="utf-8") as f:
+            f.write("{bad")
+
+        patcher = mock.patch.object(datapack, "_data_pack", datapack.DataPack(self._dir.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_loaded_on_first_use(self):
+        lasers = datapack.PackSection("lasers")
+        self.assertFalse(datapack.get_data_pack().is_loaded("lasers"))
+        self.assertEqual(lasers["LW3"]["base_damage"], 150)
+        self.assertEqual(list(lasers), ["LW3"])
+        self.assertIsNone(lasers.get("LW4"))
+
+    def test_broken_section_raises_on_use(self):
+        ammo = datapack.PackSection("ammo")  # no error yet
+        with self.assertRaises(datapack.DataPackError):
+            ammo.get("LPC11")
+
+
+if __name__ == "__main__":
+    unittest.main()
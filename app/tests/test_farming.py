@@ -0,0 +1,89 @@
+"""
+RankingSurface and BreakpointIndex checks. Run inside app/:
+
+    python -m pytest tests
+"""
+
+import random
+import unittest
+from unittest import mock
+
+from sac_pages import farming, models
+
+
+def _random_npcs(count: int, seed: int) -> list:
+    rnd = random.Random(seed)
+    return [
+        models.NPC(f"npc{i}", f"NPC {i}", "X-1", rnd.randint(500, 2_000_000), rnd.randint(0, 1_000_000),
+                   rnd.choice([0, rnd.randint(1, 400)]), 0)
+        for i in range(count)
+    ]
+
+
+def _ranked(entries: list) -> list:
+    return [(e["npc"].id, e["score"]) for e in entries]
+
+
+class RankingSurfaceTest(unittest.TestCase):
+    def test_rankings_match_direct_ranking(self):
+        npcs = _random_npcs(200, seed=4)
+        dps_values = [0.0] + farming.dps_range(1_000, 200_000, 5_000)
+        surface = farming.RankingSurface(dps_values, npcs, top_n=10)
+        for i, dps in enumerate(dps_values):
+            for n in (10, 3, 25, 0):
+                self.assertEqual(
+                    _ranked(surface.ranking(i, n)),
+                    _ranked(models.suggest_best_npcs(dps, npcs, top_n=n)),
+                    f"dps={dps} top_n={n}",
+                )
+            best = models.suggest_best_npcs(dps, npcs, top_n=1)
+            expected = npcs.index(best[0]["npc"]) if best and best[0]["score"] > 0 else None
+            self.assertEqual(surface.top_choices()[i], expected)
+
+    def test_large_input_refused(self):
+        npcs = _random_npcs(50, seed=5)
+        with mock.patch.object(farming.RankingSurface, "MAX_CELLS", 100):
+            farming.RankingSurface(farming.dps_range(1_000, 10_000, 1_000), npcs, top_n=10)
+            with self.assertRaises(ValueError):
+                farming.RankingSurface(farming.dps_range(1_000, 11_000, 1_000), npcs, top_n=10)
+            with self.assertRaises(ValueError):
+                farming.RankingSurface([1_000.0, 2_000.0, 3_000.0], npcs, top_n=0)
+
+
+class BreakpointIndexTest(unittest.TestCase):
+    def _check_sweep(self, npcs, search_time: float, top_n: int):
+        index = farming.BreakpointIndex(npcs, search_time=search_time, top_n=top_n)
+        dps_values = farming.dps_range(1_000, 200_000, 1_500)
+        for dps in dps_values + dps_values[::-1]:
+            for n in (top_n, 1):
+                self.assertEqual(
+                    _ranked(index.lookup(dps, n)),
+                    _ranked(models.suggest_best_npcs(dps, npcs, search_time, n)),
+                    f"dps={dps} top_n={n} search_time={search_time}",
+                )
+        return index
+
+    def test_lookups_match_direct_ranking(self):
+        npcs = _random_npcs(300, seed=1)
+        for search_time in (0.0, 5.0, 30.0):
+            index = self._check_sweep(npcs, search_time, top_n=10)
+            self.assertGreater(len(index), 0)
+
+    def test_repeated_npcs(self):
+        # equal curves tie everywhere; lookups must keep the input order
+        npcs = _random_npcs(40, seed=2)
+        npcs += [models.NPC(f"copy{i}", n.name, n.map, n.health, n.shields, n.reward_uri, 0)
+                 for i, n in enumerate(npcs[:20])]
+        self._check_sweep(npcs, 5.0, top_n=10)
+
+    def test_disabled_above_max_rows(self):
+        npcs = _random_npcs(20, seed=3)
+        with mock.patch.object(farming.BreakpointIndex, "MAX_ROWS", 10):
+            index = farming.BreakpointIndex(npcs, top_n=5)
+        self.assertFalse(index.enabled)
+        self.assertEqual(_ranked(index.lookup(50_000.0)), _ranked(models.suggest_best_npcs(50_000.0, npcs, top_n=5)))
+        self.assertEqual(len(index), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
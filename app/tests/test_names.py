@@ -0,0 +1,41 @@
+"""
+NameIndex checks. Run inside app/:
+
+    python -m pytest tests
+"""
+
+import unittest
+
+from sac_pages import models, names
+
+
+class NameIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.table = models.NPCTable.from_npcs([
+            models.NPC("boss", "Luminid", "X-1", 1000, 0, 1, 0),
+            models.NPC("boss", "Boss Streuner", "X-2", 2000, 0, 2, 0),
+        ])
+        self.index = names.NameIndex(npc_table=self.table)
+
+    def test_repeated_npc_ids_keep_their_names(self):
+        rows = [models.NPCRow(self.table, i) for i in range(len(self.table))]
+        self.assertEqual(self.index.display_names("npc"), {0: "Luminid", 1: "Boss Streuner"})
+        self.assertEqual(
+            [self.index.npc_display_name(row, "mod") for row in rows],
+            [models.NPC_MOD_NAME_MAP.get(n, n) for n in ("Luminid", "Boss Streuner")],
+        )
+
+    def test_rows_of_another_table(self):
+        other = models.NPCTable.from_npcs([models.NPC("x", "Luminid", "X-1", 1, 0, 0, 0)])
+        row = models.NPCRow(other, 0)
+        self.assertEqual(self.index.npc_display_name(row, "mod"), models.NPC_MOD_NAME_MAP["Luminid"])
+        self.assertEqual(self.index.npc_display_name(row), "Luminid")
+
+    def test_items_by_style(self):
+        self.assertEqual(self.index.display_name("laser", "LW3", "mod"), "LF-3")
+        self.assertEqual(self.index.display_name("laser", "LW3"), "LW-3")
+        self.assertEqual(self.index.resolve("laser", "lf-3"), "LW3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+npcs.json loading checks. Run inside app/:
+
+    python -m pytest tests
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from sac_pages import compile_data, models
+
+
+ENTRIES = [
+    {"id": "streuner", "name": "Streuner", "map": "X-1", "health": 800, "shields": 400,
+     "reward_uri": "4", "reward_credits": "400"},
+    {"id": "lordakia", "name": "Lordakia", "map": "X-1", "health": "lots", "shields": 2000,
+     "reward_uri": "8", "reward_credits": "800"},
+    {"id": "saimon", "name": "Saimon", "map": "X-2", "health": 6000, "shields": 3000,
+     "reward_uri": "16", "reward_credits": "1600"},
+]
+
+
+class _NpcFileTest(unittest.TestCase):
+    entries = []
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        npc_file = self.npc_file = os.path.join(self._dir.name, "npcs.json")
+        with open(npc_file, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+
+        # this file only, no compiled copy
+        for name, value in (
+            ("_get_npc_file", lambda: (npc_file, "TEST")),
+            ("_compiled_npc_file", lambda: os.path.join(self._dir.name, "compiled.json")),
+        ):
+            patcher = mock.patch.object(models, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class NpcLoadingTest(_NpcFileTest):
+    entries = ENTRIES
+
+    def test_bad_entry_skipped_by_both_loaders(self):
+        npcs = models.load_npcs()
+        self.assertEqual([n.id for n in npcs], ["streuner", "saimon"])
+        self.assertEqual(models.counters.get("npcs.skipped"), 1)
+
+        table = models.load_npc_table()
+        self.assertEqual(list(table.ids), ["streuner", "saimon"])
+        self.assertEqual(models.counters.get("npcs.skipped"), 1)
+
+    def _hashed_while_loading(self) -> tuple:
+        hashed = []
+        real = models._file_sha256
+
+        def spy(path):
+            hashed.append(path)
+            return real(path)
+
+        with mock.patch.object(models, "_file_sha256", spy):
+            table = models.load_npc_table()
+        return hashed, table
+
+    def test_stale_cache_reads_file_once(self):
+        models.load_npc_table()
+        with open(self.npc_file, "w", encoding="utf-8") as f:
+            json.dump(ENTRIES[:1], f)
+        hashed, table = self._hashed_while_loading()
+        self.assertEqual(hashed, [])
+        self.assertEqual(list(table.ids), ["streuner"])
+
+    def test_touched_file_is_hashed(self):
+        models.load_npc_table()
+        st = os.stat(self.npc_file)
+        os.utime(self.npc_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        hashed, table = self._hashed_while_loading()
+        self.assertEqual(hashed, [self.npc_file])
+        self.assertEqual(list(table.ids), ["streuner", "saimon"])
+
+
+class NpcTableColumnsTest(unittest.TestCase):
+    def test_short_column_rejected(self):
+        columns = {
+            "id": ["a", "b"], "name": ["A", "B"], "map": ["X-1", "X-1"], "faction": ["npc", "npc"],
+            "health": [100, 200], "shields": [50], "reward_uri": [1, 2], "reward_credits": [0, 0],
+            "is_pirate": [0, 0],
+        }
+        with self.assertRaises(ValueError):
+            models.NPCTable.from_columns(columns)
+        columns["shields"].append(60)
+        self.assertEqual(list(models.NPCTable.from_columns(columns).total_hp), [150, 260])
+
+
+# values the raw parse and compile_data used to read differently
+TRICKY_ENTRIES = [
+    {"id": "bs", "name": "BossStreuner", "map": "X-1", "health": "1_000", "shields": 500.0,
+     "reward_uri": "8", "reward_credits": 80, "is_pirate": "false"},
+    {"id": "bs", "name": "Boss Streuner", "map": "X-1", "health": 2000, "shields": 0,
+     "reward_uri": 16, "is_pirate": "yes"},
+    {"id": 7, "name": " Test NPC ", "map": "X-2", "health": 6000, "is_pirate": 0},
+    {"id": "neg", "name": "Broken", "health": -5},
+    {"id": "half", "name": "Broken", "health": 10.5},
+    {"id": "pirate?", "name": "Broken", "is_pirate": "maybe"},
+]
+
+
+def _rows(table) -> list:
+    return [tuple(getattr(npc, column) for column in models.NPCTable.COLUMNS) for npc in table]
+
+
+class NpcNormalizationTest(_NpcFileTest):
+    entries = TRICKY_ENTRIES
+
+    def test_parsed_and_compiled_tables_agree(self):
+        parsed = models.load_npc_table()
+        self.assertEqual(_rows(parsed), [
+            ("bs", "Boss Streuner", "X-1", "npc", 1000, 500, 8, 80, False),
+            ("bs", "Boss Streuner", "X-1", "npc", 2000, 0, 16, 0, True),
+            ("7", "Test NPC", "X-2", "npc", 6000, 0, 0, 0, False),
+        ])
+        self.assertEqual(models.counters.get("npcs.skipped"), 3)
+        self.assertEqual(_rows(models.load_npcs()), _rows(parsed))
+
+        report = compile_data.Report(lenient=True)
+        compiled = compile_data.compile_npcs(self.npc_file, report)
+        self.assertEqual(_rows(models.NPCTable.from_columns(compiled["columns"])), _rows(parsed))
+        self.assertEqual(compiled["skipped"], 3)
+        self.assertTrue(any("repeated id" in w for w in report.warnings))
+
+
+if __name__ == "__main__":
+    unittest.main()
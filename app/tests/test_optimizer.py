@@ -0,0 +1,91 @@
+"""
+Loadout optimizer checks. Run inside app/:
+
+    python -m pytest tests
+
+Search timings live in the benchmark (optimize_loadout[...] scenarios).
+"""
+
+import itertools
+import math
+import random
+import unittest
+
+from sac_pages import models, optimizer
+
+
+# a late-game inventory: every laser type, all drone slots
+FULL_INVENTORY = {
+    "lasers": {"LW3": 25, "LW4": 20, "LW4U": 15, "PRL": 15},
+    "drones": {"IRIS": 8, "APIS": 1, "ZEUS": 1},
+}
+
+
+def _random_inventory(rnd: random.Random) -> dict:
+    laser_types = rnd.sample(list(models.LASERS), rnd.randint(1, 3))
+    lasers = {t: {"count": rnd.randint(1, 3), "upgrade": rnd.randint(0, 16)} for t in laser_types}
+    return {
+        "lasers": lasers,
+        "ship_slots": rnd.randint(0, sum(l["count"] for l in lasers.values())),
+        "drones": {"IRIS": {"count": rnd.randint(0, 3), "level": rnd.randint(1, 16)}},
+        # one design and formation: the search is left with the split only
+        "designs": [rnd.choice(list(models.DRONE_DESIGNS))],
+        "formations": [rnd.choice(list(models.FORMATIONS))],
+    }
+
+
+def _brute_force_dps(inventory: dict) -> float:
+    """
+    Best total DPS over every ship / drone split, rated by the damage model.
+    """
+    inv = optimizer._normalize_inventory(inventory)
+    base = optimizer.DEFAULT_BASE_STATE
+    ammo = optimizer._best_ammo(inv["ammo"], False)
+    designs = {drone_id: inv["designs"][0] for drone_id in inv["drones"]}
+    formation = inv["formations"][0]
+    probe = models.compile_state(optimizer._build_state(base, inv, {}, designs, formation, ammo, False, False))
+
+    options = []
+    for entry in inv["lasers"].values():
+        n = entry["count"]
+        options.append([(s, d) for s in range(n + 1) for d in range(n + 1 - s)])
+
+    best = 0.0
+    for combo in itertools.product(*options):
+        if sum(s for s, _d in combo) > inv["ship_slots"] or sum(d for _s, d in combo) > probe.drone_slots:
+            continue
+        split = dict(zip(inv["lasers"], combo))
+        state = optimizer._build_state(base, inv, split, designs, formation, ammo, False, False)
+        best = max(best, models.calculate_damage_overview(state)["total_dps"])
+    return best
+
+
+class SplitSearchTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rnd = random.Random(7)
+        for case in range(30):
+            inventory = _random_inventory(rnd)
+            with self.subTest(case=case, inventory=inventory):
+                best = optimizer.optimize_loadout(inventory)
+                self.assertTrue(math.isclose(best["value"], _brute_force_dps(inventory), rel_tol=1e-9))
+
+
+class OptimizerTest(unittest.TestCase):
+    def test_dps_all_ship_slots(self):
+        best = optimizer.optimize_loadout(FULL_INVENTORY)
+        self.assertGreater(best["value"], 0.0)
+        self.assertEqual(best["value"], models.calculate_damage_overview(best["state"])["total_dps"])
+
+    def test_dps_limited_ship_slots(self):
+        best = optimizer.optimize_loadout(dict(FULL_INVENTORY, ship_slots=45))
+        on_ship = sum(g["count"] for g in best["state"]["laser_groups"])
+        self.assertLessEqual(on_ship, 45)
+
+    def test_uri_per_hour(self):
+        best = optimizer.optimize_loadout(FULL_INVENTORY, objective="uri_per_hour", npcs=models.load_npcs())
+        self.assertIsNotNone(best["npc"])
+        self.assertGreater(best["value"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
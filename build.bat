@@ -4,6 +4,8 @@ REM Space Aces Companion - build.bat
 REM Project root:  C:\Users\joshu\Desktop\Space Aces Companion
 REM main.py:       app\main.py
 REM npcs.json:     app\data\npcs.json
+REM data pack:     app\data\pack\
+REM compiled data: app\data\compiled\ (sac_pages.compile_data)
 REM ============================================
 
 REM In das Verzeichnis der .bat wechseln
@@ -32,6 +34,12 @@ IF NOT EXIST "app\data\npcs.json" (
     exit /b
 )
 
+IF NOT EXIST "app\data\pack\manifest.json" (
+    echo ERROR: Could not find app\data\pack\manifest.json
+    pause
+    exit /b
+)
+
 echo Using Python from: %VENV_PY%
 echo.
 
@@ -63,6 +71,19 @@ if exist app\SpaceAcesCompanion.spec (
     del /Q app\SpaceAcesCompanion.spec
 )
 
+echo.
+echo Validating and compiling data files ...
+echo.
+
+pushd app
+"..\venv\Scripts\python.exe" -m sac_pages.compile_data
+IF ERRORLEVEL 1 (
+    popd
+    echo ERROR: Data validation failed, see the messages above.
+    pause
+    exit /b
+)
+popd
 echo.
 echo Running PyInstaller from app\ ...
 echo.
@@ -73,12 +94,13 @@ pushd app
     --onefile ^
     --noconfirm ^
     --name "SpaceAcesCompanion" ^
+    --add-data "data\pack;pack" ^
     main.py
 
 popd
 
 echo.
-echo Copying EXE and npcs.json to root dist\ ...
+echo Copying EXE, npcs.json and data pack to root dist\ ...
 echo.
 
 mkdir dist >nul 2>&1
@@ -91,11 +113,15 @@ IF NOT EXIST "app\dist\SpaceAcesCompanion.exe" (
 
 copy /Y "app\dist\SpaceAcesCompanion.exe" "dist\SpaceAcesCompanion.exe" >nul
 copy /Y "app\data\npcs.json" "dist\npcs.json" >nul
+xcopy /E /I /Y /Q "app\data\pack" "dist\pack" >nul
+xcopy /E /I /Y /Q "app\data\compiled" "dist\compiled" >nul
 
 echo --------------------------------------------
 echo Build finished.
 echo EXE:  dist\SpaceAcesCompanion.exe
 echo JSON: dist\npcs.json
+echo PACK: dist\pack\
+echo DATA: dist\compiled\
 echo --------------------------------------------
 echo.
 pause